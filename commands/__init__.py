@@ -0,0 +1,7 @@
+"""
+Plugin commands for the launch manager
+
+The manager loads each commands/<name>.py as commands.<name>; files starting
+with '_' are shared helpers rather than commands. Being a regular package lets
+process-pool workers import the same modules by name.
+"""
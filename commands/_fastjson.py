@@ -0,0 +1,27 @@
+"""
+JSON loads/dumps that use orjson when it is installed and fall back to json
+
+dumps() returns bytes either way; loads() accepts str or bytes. Decode errors
+are ValueErrors (json.JSONDecodeError) with both backends. dumps() passes
+default, for types JSON can't represent natively, to either backend.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj, indent=False, default=None):
+        """Serialize obj to JSON bytes, indented by 2 spaces if indent is set"""
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if indent else 0)
+else:
+    loads = json.loads
+
+    def dumps(obj, indent=False, default=None):
+        """Serialize obj to JSON bytes, indented by 2 spaces if indent is set"""
+        return json.dumps(obj, indent=2 if indent else None, default=default).encode('utf-8')
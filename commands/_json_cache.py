@@ -0,0 +1,57 @@
+"""
+Per-file result caches that stay valid while a file's inode, mtime and size don't change
+
+The manager keeps plugin modules loaded, so repeated commands on an unchanged
+todo list or stream file can reuse what was parsed last time instead of
+reading and decoding the file again.
+"""
+import os
+import threading
+
+from commands._fastjson import loads
+
+# Most files remembered at once; the oldest entry is dropped beyond this
+MAX_ENTRIES = 64
+
+# (path, compute function) -> ((st_ino, st_mtime_ns, st_size), result).
+# The manager runs commands on several threads at once, so _cache is only
+# touched with _cache_lock held.
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def cached_for_file(path, compute):
+    """Return compute(path), reusing the last result while the file is unchanged
+
+    Raises OSError from stat() (e.g. FileNotFoundError) and anything compute
+    raises; failures are not cached. Results are shared between callers, so
+    treat them as read-only.
+    """
+    st = os.stat(path)
+    # The inode catches a file replaced by rename with the same size within
+    # one timestamp tick
+    stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+    key = (os.fspath(path), compute)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    result = compute(path)
+    with _cache_lock:
+        _cache.pop(key, None)
+        if len(_cache) >= MAX_ENTRIES:
+            del _cache[next(iter(_cache))]
+        _cache[key] = (stamp, result)
+    return result
+
+
+def _load_json(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def load_json_cached(path):
+    """Parse a JSON file, reusing the last result while the file is unchanged"""
+    return cached_for_file(path, _load_json)
@@ -0,0 +1,88 @@
+"""
+A process pool shared by the commands that parse session files in parallel
+
+The manager keeps plugin modules loaded, so the pool is started on first use
+and reused by later commands rather than paying for a fresh set of workers on
+every invocation. Workers import the functions they run by module name, so the
+pool is only used when that name resolves to the file the manager loaded.
+"""
+import importlib.machinery
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# module name -> whether pool workers would import the same file
+_importable = {}
+
+
+def workers_can_import(module_name):
+    """Whether a worker importing module_name by name would load the loaded module's file"""
+    if module_name not in _importable:
+        module = sys.modules.get(module_name)
+        origin = None
+        package, _, _ = module_name.rpartition('.')
+        try:
+            # Resolved through sys.path as a fresh interpreter would, ignoring
+            # the already-registered module
+            spec = importlib.machinery.PathFinder.find_spec(package)
+            if spec is not None and spec.submodule_search_locations:
+                spec = importlib.machinery.PathFinder.find_spec(
+                    module_name, spec.submodule_search_locations)
+                origin = spec.origin if spec is not None else None
+            _importable[module_name] = (
+                origin is not None and getattr(module, '__file__', None) is not None
+                and os.path.samefile(origin, module.__file__))
+        except (ImportError, OSError, ValueError):
+            _importable[module_name] = False
+    return _importable[module_name]
+
+
+def get_pool():
+    """Return the shared pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver rather than fork: the manager is multi-threaded, and a
+            # forked child could inherit a lock some other thread was holding
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context('forkserver'))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Shut a broken pool down so the next get_pool() starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parallel_map(func, *iterables):
+    """Return list(map(func, *iterables)) computed in the shared pool
+
+    Returns None if the pool can't be used, after logging why; callers then
+    run the work serially.
+    """
+    if not workers_can_import(func.__module__):
+        logger.warning("%s isn't importable by pool workers, parsing serially", func.__module__)
+        return None
+
+    pool = get_pool()
+    try:
+        return list(pool.map(func, *iterables))
+    except BrokenProcessPool as e:
+        logger.warning("Process pool broke, parsing serially: %s", e)
+        _discard_pool(pool)
+    except Exception as e:
+        logger.warning("Parallel parse failed, parsing serially: %s", e)
+    return None
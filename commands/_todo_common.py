@@ -0,0 +1,53 @@
+"""
+Todo file helpers shared by the todo-* commands
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+from commands._fastjson import dumps
+from commands._json_cache import load_json_cached
+
+
+def get_todo_file(session_id):
+    """Return the path of a session's todo list"""
+    return Path.home() / '.claude' / 'todos' / f"{session_id}.json"
+
+
+def load_todos(todo_file):
+    """Load todos from file, return empty list if doesn't exist
+
+    The parsed file is cached, so this returns a fresh list each call; the
+    todo dicts in it are shared, so copy one before changing it.
+    """
+    try:
+        return list(load_json_cached(todo_file))
+    except FileNotFoundError:
+        return []
+    except (json.JSONDecodeError, IOError):
+        return []
+
+
+def save_todos(todo_file, todos):
+    """Save todos to file"""
+    # Ensure the directory exists
+    todo_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Serialize up front and swap the file in atomically, so a crash mid-write
+    # can't leave a truncated todo list behind
+    data = dumps(todos, indent=True)
+    tmp_file = todo_file.with_suffix('.json.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, todo_file)
+
+
+def generate_todo_id():
+    """Generate a unique todo ID"""
+    # Imported here so adds with an explicit --id (and todo-list) don't pay
+    # for loading secrets and its dependencies
+    import secrets
+
+    # Use timestamp + 8 random hex chars for uniqueness and readability
+    return f"todo_{time.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}"
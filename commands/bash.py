@@ -10,8 +10,12 @@ Examples:
 """
 import subprocess
 import argparse
+import select
+import signal
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 import os
 
@@ -26,12 +30,116 @@ def get_parser():
     parser.add_argument('--no-log', action='store_true', help='Disable logging to file')
     return parser
 
+_PARSER = get_parser()
+
+# returncode of a child that was reaped by someone else (e.g. a stray
+# waitpid(-1)), so its real exit status is lost
+UNKNOWN_RETURNCODE = 'unknown'
+
+class SpawnedProcess:
+    """Minimal Popen stand-in for a child started with os.posix_spawn"""
+    
+    def __init__(self, args, pid: int, stdout=None):
+        self.args = args
+        self.pid = pid
+        self.stdout = stdout
+        self.returncode = None
+        self._waitpid_lock = threading.Lock()
+    
+    def poll(self):
+        """Reap the child if it has exited, without blocking"""
+        # Skip if another thread is already waiting on the child, like Popen
+        if self.returncode is None and self._waitpid_lock.acquire(False):
+            try:
+                if self.returncode is None:
+                    pid, status = os.waitpid(self.pid, os.WNOHANG)
+                    if pid == self.pid:
+                        self.returncode = os.waitstatus_to_exitcode(status)
+            except ChildProcessError:
+                self.returncode = UNKNOWN_RETURNCODE
+            finally:
+                self._waitpid_lock.release()
+        return self.returncode
+    
+    def wait(self, timeout=None):
+        """Wait for the child to exit, raising TimeoutExpired like Popen"""
+        if timeout is not None and self.poll() is None and not self._exited_within(timeout):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        with self._waitpid_lock:
+            if self.returncode is None:
+                try:
+                    _, status = os.waitpid(self.pid, 0)
+                    self.returncode = os.waitstatus_to_exitcode(status)
+                except ChildProcessError:
+                    self.returncode = UNKNOWN_RETURNCODE
+        return self.returncode
+    
+    def _exited_within(self, timeout: float) -> bool:
+        """Block until the child exits or the timeout passes, without reaping it"""
+        try:
+            pidfd = os.pidfd_open(self.pid)
+        except (AttributeError, OSError):
+            # No pidfd support (or already reaped): fall back to polling
+            deadline = time.monotonic() + timeout
+            while self.poll() is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(remaining, 0.05))
+            return True
+        try:
+            return bool(select.select([pidfd], [], [], timeout)[0])
+        finally:
+            os.close(pidfd)
+    
+    def send_signal(self, sig: int):
+        # Never signal a pid that has already been reaped and may be reused
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+    
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+    
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+def spawn_shell(bash_command: str, out_fd: int, gate_fd: Optional[int] = None) -> SpawnedProcess:
+    """Run a command under /bin/sh with stdout and stderr sent to out_fd
+
+    If gate_fd (the read end of a pipe) is given, the command doesn't start
+    until the pipe's write end is closed, so the caller can write to out_fd
+    first knowing the child's PID.
+    """
+    # posix_spawn uses vfork on Linux, so this stays cheap however large
+    # the controller gets; fork() would have to copy its page tables
+    args = ['/bin/sh', '-c', bash_command]
+    spawn_args = args
+    file_actions = [
+        (os.POSIX_SPAWN_DUP2, out_fd, 1),
+        (os.POSIX_SPAWN_DUP2, out_fd, 2),
+    ]
+    if gate_fd is not None:
+        # Wait for EOF on fd 3, then exec the real shell in place: the PID is
+        # unchanged and the command sees the same $0 and arguments as above
+        spawn_args = ['/bin/sh', '-c', 'read _ <&3; exec 3<&-; exec /bin/sh -c "$1"',
+                      '/bin/sh', bash_command]
+        file_actions.append((os.POSIX_SPAWN_DUP2, gate_fd, 3))
+    pid = os.posix_spawn(
+        spawn_args[0], spawn_args, os.environ,
+        file_actions=file_actions,
+        # Popen restores these for the child too
+        setsigdef=(signal.SIGPIPE, signal.SIGXFSZ)
+    )
+    return SpawnedProcess(args, pid)
+
 def command(manager, args: list) -> Dict[str, Any]:
     """Execute a bash command as a managed process"""
     # Parse arguments
-    parser = get_parser()
     try:
-        parsed_args = parser.parse_args(args)
+        parsed_args = _PARSER.parse_args(args)
     except SystemExit:
         # argparse tries to exit on error, capture the help text
         return {'success': False, 'error': 'Invalid arguments. Use "claudecontroller help bash" for usage.'}
@@ -39,72 +147,77 @@ def command(manager, args: list) -> Dict[str, Any]:
     bash_command = parsed_args.command
     base_name = parsed_args.name
     
-    # Start the process first to get PID
     try:
+        # Generate a name from the command up front so the log can be
+        # fully set up before the child starts writing to it
+        if not base_name:
+            cmd_prefix = bash_command.split()[0].split('/')[-1][:10]
+            base_name = f"bash-{cmd_prefix}"
+        
         # Set up logging
         log_dir = Path(__file__).parent.parent / 'logs' / 'bash'
         log_dir.mkdir(parents=True, exist_ok=True)
         
         # Start the process
         if parsed_args.no_log:
-            proc = subprocess.Popen(
-                bash_command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
-            )
+            # Discard output; a pipe nobody drains would block the child once full
+            with open(os.devnull, 'wb') as devnull:
+                proc = spawn_shell(bash_command, devnull.fileno())
         else:
-            # Create log file with timestamp and PID (will be updated with actual PID)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            temp_log_name = f"{timestamp}_temp.log"
-            log_file_path = log_dir / temp_log_name
-            log_file = open(log_file_path, 'w')
-            
-            proc = subprocess.Popen(
-                bash_command,
-                shell=True,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
-            )
-        
-        # Now we have the PID, create the process name
-        if not base_name:
-            # Generate a name from command
-            cmd_prefix = bash_command.split()[0].split('/')[-1][:10]
-            base_name = f"bash-{cmd_prefix}"
+            log_file_path = log_dir / f"{timestamp}_{base_name}.log"
+            gate_read, gate_write = os.pipe()
+            try:
+                with open(log_file_path, 'w') as log_file:
+                    try:
+                        proc = spawn_shell(bash_command, log_file.fileno(), gate_read)
+                    finally:
+                        os.close(gate_read)
+                    
+                    # The command is held back until the gate closes, so its
+                    # output always follows the header
+                    log_file.write(
+                        f"=== Process: {base_name}-{proc.pid} ===\n"
+                        f"Command: {bash_command}\n"
+                        f"Started: {datetime.now().isoformat()}\n"
+                        f"PID: {proc.pid}\n"
+                        f"{'=' * 50}\n"
+                    )
+                    log_file.flush()
+            finally:
+                os.close(gate_write)
         
         # Append PID to make it unique
         process_name = f"{base_name}-{proc.pid}"
         
-        # Rename log file with actual process name
+        # Add the PID to the log file name now that it is known
         if not parsed_args.no_log:
-            final_log_name = f"{timestamp}_{process_name}.log"
-            final_log_path = log_dir / final_log_name
+            final_log_path = log_dir / f"{timestamp}_{process_name}.log"
             log_file_path.rename(final_log_path)
-            
-            # Write header to log
-            log_file.write(f"=== Process: {process_name} ===\n")
-            log_file.write(f"Command: {bash_command}\n")
-            log_file.write(f"Started: {datetime.now().isoformat()}\n")
-            log_file.write(f"PID: {proc.pid}\n")
-            log_file.write("=" * 50 + "\n")
-            log_file.flush()
         
         # Store process info
         manager.processes[process_name] = proc
         manager.process_info[process_name] = {
             'command': bash_command,
             'started': datetime.now().isoformat(),
+            'started_monotonic': time.monotonic(),
             'type': 'bash',
             'pid': proc.pid,
             'base_name': base_name,
-            'log_file': str(final_log_path) if not parsed_args.no_log else None
+            'log_file': str(final_log_path) if not parsed_args.no_log else None,
+            'log_basename': final_log_path.name if not parsed_args.no_log else None
         }
         
+        # Let the manager learn about the exit from the kernel instead of polling
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except (AttributeError, OSError):
+            # No pidfd support: fall back to the manager's SIGCHLD handler,
+            # or to bash-status polling where that isn't available either
+            manager.watch_pid(process_name, proc.pid)
+        else:
+            manager.register_pidfd(process_name, pidfd)
+        
         return {
             'success': True,
             'pid': proc.pid,
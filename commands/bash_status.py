@@ -7,6 +7,8 @@ Shows status of bash processes with duration and exit codes.
 If no name is specified, shows all bash processes.
 """
 import argparse
+import os
+import time
 from typing import Dict, Any
 from datetime import datetime
 
@@ -20,40 +22,72 @@ def get_parser():
     parser.add_argument('--all', '-a', action='store_true', help='Show all processes, not just bash')
     return parser
 
-def format_duration(start_time_str: str, end_time_str: str = None) -> str:
+_PARSER = get_parser()
+
+def format_duration(total_seconds: float) -> str:
     """Format duration in human-readable form"""
+    if total_seconds is None:
+        return "unknown"
+    total_seconds = int(total_seconds)
+    if total_seconds < 60:
+        return f"{total_seconds}s"
+    elif total_seconds < 3600:
+        minutes = total_seconds // 60
+        seconds = total_seconds % 60
+        return f"{minutes}m {seconds}s"
+    else:
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        return f"{hours}h {minutes}m"
+
+def elapsed_seconds(info: Dict[str, Any], now_mono: float):
+    """Seconds a process ran (or has been running so far)"""
+    started = info.get('started_monotonic')
+    if started is not None:
+        return info.get('ended_monotonic', now_mono) - started
+    # Processes not started by bash only carry ISO timestamps
     try:
-        start_time = datetime.fromisoformat(start_time_str)
-        end_time = datetime.fromisoformat(end_time_str) if end_time_str else datetime.now()
-        duration = end_time - start_time
-        
-        # Format duration
-        total_seconds = int(duration.total_seconds())
-        if total_seconds < 60:
-            return f"{total_seconds}s"
-        elif total_seconds < 3600:
-            minutes = total_seconds // 60
-            seconds = total_seconds % 60
-            return f"{minutes}m {seconds}s"
-        else:
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            return f"{hours}h {minutes}m"
+        start_time = datetime.fromisoformat(info['started'])
+        end_time = datetime.fromisoformat(info['ended']) if 'ended' in info else datetime.now()
+        return (end_time - start_time).total_seconds()
     except:
-        return "unknown"
+        return None
+
+def format_status(name: str, proc_info: Dict[str, Any]) -> str:
+    """Format one process's status entry (plus its log line, if any)"""
+    proc_status = proc_info['status']
+    if proc_status == 'running':
+        line = f"[{name}] RUNNING (pid: {proc_info['pid']}, {proc_info['duration']})"
+    elif proc_status == 'exited':
+        exit_code = proc_info['exit_code']
+        if exit_code == 0:
+            exit_status = "SUCCESS"
+        elif isinstance(exit_code, int):
+            exit_status = f"FAILED ({exit_code})"
+        else:
+            # Reaped elsewhere, so the real exit status was lost
+            exit_status = "EXITED (status unknown)"
+        line = f"[{name}] {exit_status} ({proc_info['duration']})"
+    else:
+        line = f"[{name}] NOT STARTED"
+    
+    if proc_info.get('log_file'):
+        log_name = proc_info.get('log_basename') or os.path.basename(proc_info['log_file'])
+        line = f"{line}\n  Log: {log_name}"
+    return line
 
 def command(manager, args: list) -> Dict[str, Any]:
     """Check status of bash processes"""
     # Parse arguments
-    parser = get_parser()
     try:
-        parsed_args = parser.parse_args(args)
+        parsed_args = _PARSER.parse_args(args)
     except SystemExit:
         return {'success': False, 'error': 'Invalid arguments. Use "claudecontroller help bash-status" for usage.'}
     
     target_name = parsed_args.name
     show_all = parsed_args.all
     
+    now_mono = time.monotonic()
     status = {}
     for name, info in manager.process_info.items():
         # Filter for bash processes unless --all
@@ -66,10 +100,15 @@ def command(manager, args: list) -> Dict[str, Any]:
             
         proc = manager.processes.get(name)
         if proc:
-            proc.poll()
-            if proc.returncode is None:
+            # Watched processes have their exit pushed into process_info by
+            # the manager; only poll the ones it isn't watching
+            returncode = info.get('returncode')
+            if returncode is None and name not in manager.exit_watched:
+                returncode = proc.poll()
+            
+            if returncode is None:
                 # Still running
-                duration = format_duration(info['started'])
+                duration = format_duration(elapsed_seconds(info, now_mono))
                 status[name] = {
                     'status': 'running',
                     'pid': proc.pid,
@@ -77,25 +116,27 @@ def command(manager, args: list) -> Dict[str, Any]:
                     'started': info['started'],
                     'duration': duration,
                     'base_name': info.get('base_name', name),
-                    'log_file': info.get('log_file')
+                    'log_file': info.get('log_file'),
+                    'log_basename': info.get('log_basename')
                 }
             else:
-                # Process ended
-                end_time = info.get('ended', datetime.now().isoformat())
-                duration = format_duration(info['started'], end_time)
+                # Process ended; stamp the end time if nobody has yet
+                if 'ended' not in info:
+                    info['ended'] = datetime.now().isoformat()
+                    info['ended_monotonic'] = now_mono
+                end_time = info['ended']
+                duration = format_duration(elapsed_seconds(info, now_mono))
                 status[name] = {
                     'status': 'exited',
-                    'exit_code': proc.returncode,
+                    'exit_code': returncode,
                     'command': info['command'],
                     'started': info['started'],
                     'ended': end_time,
                     'duration': duration,
                     'base_name': info.get('base_name', name),
-                    'log_file': info.get('log_file')
+                    'log_file': info.get('log_file'),
+                    'log_basename': info.get('log_basename')
                 }
-                # Update ended time if not set
-                if 'ended' not in info:
-                    info['ended'] = end_time
         else:
             status[name] = {
                 'status': 'not started',
@@ -108,25 +149,7 @@ def command(manager, args: list) -> Dict[str, Any]:
     
     # Custom formatting for status output
     if status:
-        output_lines = []
-        for name, proc_info in sorted(status.items()):
-            proc_status = proc_info['status']
-            base_name = proc_info.get('base_name', name)
-            
-            if proc_status == 'running':
-                line = f"[{name}] RUNNING (pid: {proc_info['pid']}, {proc_info['duration']})"
-            elif proc_status == 'exited':
-                exit_code = proc_info['exit_code']
-                exit_status = "SUCCESS" if exit_code == 0 else f"FAILED ({exit_code})"
-                line = f"[{name}] {exit_status} ({proc_info['duration']})"
-            else:
-                line = f"[{name}] NOT STARTED"
-            
-            output_lines.append(line)
-            
-            # Add command info in verbose mode (check parent context)
-            if proc_info.get('log_file'):
-                output_lines.append(f"  Log: {proc_info['log_file'].split('/')[-1]}")
+        output_lines = [format_status(name, proc_info) for name, proc_info in sorted(status.items())]
         
         return {
             'success': True,
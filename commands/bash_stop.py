@@ -5,21 +5,37 @@ Usage: claudecontroller bash-stop <process_name>
 
 Stops a running bash process by name.
 """
+import argparse
 from typing import Dict, Any
 
+def get_parser():
+    """Get argument parser for this command"""
+    parser = argparse.ArgumentParser(
+        prog='claudecontroller bash-stop',
+        description='Stop a bash process'
+    )
+    parser.add_argument('name', help='Name of the process to stop')
+    return parser
+
+_PARSER = get_parser()
+
 def command(manager, args: list) -> Dict[str, Any]:
     """Stop a bash process"""
-    if not args:
-        return {'success': False, 'error': 'No process name specified'}
+    # Parse arguments
+    try:
+        parsed_args = _PARSER.parse_args(args)
+    except SystemExit:
+        return {'success': False, 'error': 'Invalid arguments. Use "claudecontroller help bash-stop" for usage.'}
     
-    process_name = args[0]
+    process_name = parsed_args.name
     
-    # Check if process exists
-    if process_name not in manager.processes:
+    # Check if process exists (process_info outlives the process, so both are needed)
+    info = manager.process_info.get(process_name)
+    if info is None or process_name not in manager.processes:
         return {'success': False, 'error': f'Process "{process_name}" not found'}
     
     # Check if it's a bash process
-    if manager.process_info.get(process_name, {}).get('type') != 'bash':
+    if info.get('type') != 'bash':
         return {'success': False, 'error': f'"{process_name}" is not a bash process'}
     
     # Stop the process
@@ -28,4 +44,4 @@ def command(manager, args: list) -> Dict[str, Any]:
     return {
         'success': True,
         'message': f'Stopped bash process "{process_name}"'
-    }
\ No newline at end of file
+    }
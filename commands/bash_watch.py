@@ -5,13 +5,13 @@ Usage: claudecontroller bash-watch <process_name> [--lines <n>]
 
 Shows the recent output from a bash process. By default shows last 50 lines.
 """
+import os
 import subprocess
 import argparse
 from typing import Dict, Any
-from collections import deque
 
-# Global output buffers for each process
-OUTPUT_BUFFERS = {}
+# Bytes read per step when scanning a log backwards
+TAIL_BLOCK_SIZE = 65536
 
 def get_parser():
     """Get argument parser for this command"""
@@ -24,12 +24,37 @@ def get_parser():
                        help='Number of lines to show (default: 50)')
     return parser
 
+_PARSER = get_parser()
+
+def tail_log(log_file: str, num_lines: int) -> list:
+    """Return the last num_lines lines of a log file, reading it from the end"""
+    fd = os.open(log_file, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        pos = os.fstat(fd).st_size
+        blocks = []
+        newlines = 0
+        # Step backwards until we have one more newline than lines wanted,
+        # so the first line kept is known to be complete. pread() reads at
+        # an offset in one syscall, with no separate seek.
+        while pos > 0 and (num_lines <= 0 or newlines <= num_lines):
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            block = os.pread(fd, step, pos)
+            newlines += block.count(b'\n')
+            blocks.append(block)
+    finally:
+        os.close(fd)
+    
+    lines = b''.join(reversed(blocks)).splitlines()
+    if num_lines > 0:
+        lines = lines[-num_lines:]
+    return [line.decode('utf-8', errors='replace').rstrip() for line in lines]
+
 def command(manager, args: list) -> Dict[str, Any]:
     """Watch output of a bash process"""
     # Parse arguments
-    parser = get_parser()
     try:
-        parsed_args = parser.parse_args(args)
+        parsed_args = _PARSER.parse_args(args)
     except SystemExit:
         return {'success': False, 'error': 'Invalid arguments. Use "claudecontroller help bash-watch" for usage.'}
     
@@ -41,41 +66,36 @@ def command(manager, args: list) -> Dict[str, Any]:
         return {'success': False, 'error': f'Process "{process_name}" not found'}
     
     proc = manager.processes[process_name]
-    proc.poll()
+    info = manager.process_info.get(process_name, {})
+    # Prefer the status the manager recorded when it saw the exit
+    returncode = info.get('returncode')
+    if returncode is None:
+        returncode = proc.poll()
+    log_file = info.get('log_file')
     
-    if proc.returncode is not None:
-        return {
-            'success': True,
-            'output': f'Process "{process_name}" has stopped with return code {proc.returncode}'
-        }
-    
-    # Initialize buffer if needed
-    if process_name not in OUTPUT_BUFFERS:
-        OUTPUT_BUFFERS[process_name] = deque(maxlen=1000)
-    
-    buffer = OUTPUT_BUFFERS[process_name]
+    if not log_file:
+        if returncode is not None:
+            return {
+                'success': True,
+                'output': f'Process "{process_name}" has stopped with return code {returncode}'
+            }
+        return {'success': True, 'output': f'No log file for process "{process_name}"'}
     
-    # Read available output
+    # The log holds everything the process wrote, so this works after exit too
     try:
-        while True:
-            line = proc.stdout.readline()
-            if not line:
-                break
-            buffer.append(line.rstrip())
-    except:
-        pass
-    
-    # Get requested lines
-    output_lines = list(buffer)[-num_lines:]
+        output_lines = tail_log(log_file, num_lines)
+    except OSError as e:
+        return {'success': False, 'error': f'Could not read log file: {e}'}
     
     if output_lines:
         output = '\n'.join(output_lines)
+        status = f', exited with code {returncode}' if returncode is not None else ''
         return {
             'success': True,
-            'output': f'=== Output from {process_name} (last {len(output_lines)} lines) ===\n{output}'
+            'output': f'=== Output from {process_name} (last {len(output_lines)} lines{status}) ===\n{output}'
         }
     else:
         return {
             'success': True,
             'output': f'No output yet from process "{process_name}"'
-        }
\ No newline at end of file
+        }
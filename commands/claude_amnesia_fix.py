@@ -9,12 +9,22 @@ Examples:
   claudecontroller claude-amnesia-fix --message ""  # Remove the message entirely
 """
 import argparse
+import functools
+import mmap
 import os
 import re
 import subprocess
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+# The continuation message as it appears in cli.js (possibly mid-string).
+# Patterns are bytes so they can scan a read-only mmap of the bundle directly.
+_MSG_RE = re.compile(rb'Please continue the conversation from where we left it off[^"\'`]*')
+
+# The full stock message, and a looser fallback that stops at the string end
+_MSG_RE_FULL = re.compile(rb'Please continue the conversation from where we left it off without asking the user any further questions\. Continue with the last task that you were asked to work on\.')
+_MSG_RE_LOOSE = re.compile(rb'Please continue the conversation from where we left it off[^"\'`]*?(?=["\'`;])')
+
 
 def get_parser():
     """Get argument parser for this command"""
@@ -26,11 +36,17 @@ def get_parser():
                        help='Custom message to replace the default (use empty string to remove)')
     parser.add_argument('--show', action='store_true',
                        help='Just show current message without modifying')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Search for the CLI.js file again instead of using the cached location')
     return parser
 
 
+_PARSER = get_parser()
+
+
+@functools.lru_cache(maxsize=1)
 def find_claude_cli() -> Optional[Path]:
-    """Find the Claude Code CLI.js file"""
+    """Find the Claude Code CLI.js file (cached for the life of the manager once found)"""
     # First try 'which claude' to find the executable
     try:
         result = subprocess.run(['which', 'claude'], capture_output=True, text=True, check=True)
@@ -75,17 +91,36 @@ def find_claude_cli() -> Optional[Path]:
     ]
     
     for search_dir in search_dirs:
-        if search_dir.exists():
-            # Use find command for efficiency
-            try:
-                result = subprocess.run(
-                    ['find', str(search_dir), '-path', '*/claude-code/cli.js', '-type', 'f'],
-                    capture_output=True, text=True, check=True
-                )
-                if result.stdout.strip():
-                    return Path(result.stdout.strip().split('\n')[0])
-            except subprocess.CalledProcessError:
-                pass
+        cli_path = _scan_for_cli(str(search_dir))
+        if cli_path:
+            return cli_path
+    
+    return None
+
+
+def _scan_for_cli(root: str) -> Optional[Path]:
+    """Walk root in-process looking for */claude-code/cli.js, stopping at the first hit"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        
+        dir_name = os.path.basename(directory)
+        with entries:
+            for entry in entries:
+                if entry.name == 'cli.js' and dir_name == 'claude-code':
+                    if entry.is_file():
+                        return Path(entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    # Skip hidden dirs (.git, .cache) and unrelated packages
+                    if entry.name.startswith('.'):
+                        continue
+                    if dir_name == 'node_modules' and entry.name not in ('@anthropic-ai', 'claude-code'):
+                        continue
+                    stack.append(entry.path)
     
     return None
 
@@ -93,15 +128,13 @@ def find_claude_cli() -> Optional[Path]:
 def extract_current_message(cli_path: Path) -> Optional[str]:
     """Extract the current continuation message from cli.js"""
     try:
-        content = cli_path.read_text(encoding='utf-8')
-        
-        # Look for the pattern: "Please continue the conversation from where we left it off..."
-        # In minified code it might be part of a larger string
-        pattern = r'Please continue the conversation from where we left it off[^"\'`]*'
-        match = re.search(pattern, content)
-        
-        if match:
-            return match.group(0)
+        with open(cli_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # In minified code the message might be part of a larger string
+            match = _MSG_RE.search(mm)
+            
+            if match:
+                return match.group(0).decode('utf-8', errors='replace')
         
         return None
     except Exception as e:
@@ -111,40 +144,49 @@ def extract_current_message(cli_path: Path) -> Optional[str]:
 def replace_message(cli_path: Path, new_message: str) -> bool:
     """Replace the continuation message in cli.js"""
     try:
-        content = cli_path.read_text(encoding='utf-8')
-        
-        # Pattern to match the full message
-        pattern = r'Please continue the conversation from where we left it off without asking the user any further questions\. Continue with the last task that you were asked to work on\.'
-        
-        # Replace with new message
-        new_content = re.sub(pattern, new_message, content)
-        
-        if new_content == content:
-            # Try a more flexible pattern if exact match fails
-            pattern = r'Please continue the conversation from where we left it off[^"\'`]*?(?=["\'`;])'
-            new_content = re.sub(pattern, new_message, content)
+        # Scan the mapped file first; only read it into memory if there is
+        # something to replace
+        with open(cli_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _MSG_RE_FULL.search(mm):
+                pattern = _MSG_RE_FULL
+            elif _MSG_RE_LOOSE.search(mm):
+                # Try a more flexible pattern if exact match fails
+                pattern = _MSG_RE_LOOSE
+            else:
+                return False
         
-        if new_content != content:
-            cli_path.write_text(new_content, encoding='utf-8')
-            return True
+        content = cli_path.read_bytes()
+        # Branch on the substitution count rather than comparing the
+        # multi-megabyte file against its rewritten copy
+        new_content, count = pattern.subn(new_message.encode('utf-8'), content)
+        if not count:
+            return False
         
-        return False
+        cli_path.write_bytes(new_content)
+        return True
     except Exception:
         return False
 
 
 def command(manager, args: list) -> Dict[str, Any]:
     """Execute the claude-amnesia-fix command"""
-    parser = get_parser()
     try:
-        parsed_args = parser.parse_args(args)
+        parsed_args = _PARSER.parse_args(args)
     except SystemExit:
         return {'success': False, 'error': 'Invalid arguments. Use "claudecontroller help claude-amnesia-fix" for usage.'}
     
-    # Find the CLI.js file
+    # Find the CLI.js file, searching again if asked to or if it has moved
+    if parsed_args.refresh:
+        find_claude_cli.cache_clear()
     cli_path = find_claude_cli()
+    if cli_path and not cli_path.exists():
+        find_claude_cli.cache_clear()
+        cli_path = find_claude_cli()
     
     if not cli_path:
+        # Only a found location is kept: Claude may be installed later
+        find_claude_cli.cache_clear()
         return {
             'success': False,
             'error': 'Could not find Claude Code CLI.js file. Is Claude Code installed?'
@@ -2,26 +2,48 @@
 Inspect Task agent actions from Claude JSONL files
 """
 import argparse
+import functools
 import json
 import os
 import re
+import sys
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 
+from commands._fastjson import dumps, loads
+from commands._pool import parallel_map
 
-class SafeJSONEncoder(json.JSONEncoder):
-    """JSON encoder that handles datetime objects and other non-serializable types"""
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        elif isinstance(obj, Path):
-            return str(obj)
-        elif hasattr(obj, '__dict__'):
-            return obj.__dict__
-        else:
-            # Let the base class raise the TypeError
-            return super().default(obj)
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+_DASH_RUN_RE = re.compile(r'-+')
+# fromisoformat() understands a trailing 'Z' from Python 3.11 on
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+# Below this many session files, parse serially rather than use the worker pool
+PARALLEL_MIN_FILES = 3
+
+_WS_RE = re.compile(r'\s+')
+_REGEX_META_RE = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# Section rules for the hierarchical text output
+_SEP80 = "=" * 80
+_SEP60 = "-" * 60
+_SEP20 = "-" * 20
+
+
+# Converters for the non-JSON types that can show up in output, keyed by
+# exact type (Path() is the concrete PosixPath/WindowsPath class)
+_SERIALIZERS = {
+    datetime: datetime.isoformat,
+    type(Path()): str,
+}
+
+
+def _json_default(obj):
+    """Serialize types json/orjson can't handle natively"""
+    serializer = _SERIALIZERS.get(type(obj))
+    if serializer is not None:
+        return serializer(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def get_parser():
@@ -40,15 +62,17 @@ def get_parser():
     return parser
 
 
+@functools.lru_cache(maxsize=256)
 def sanitize_path_for_claude(path):
     """Convert a filesystem path to Claude's project directory format"""
     # Replace all non-alphanumeric characters with dashes
-    sanitized = re.sub(r'[^a-zA-Z0-9]', '-', path)
+    sanitized = _NON_ALNUM_RE.sub('-', path)
     # Collapse multiple consecutive dashes
-    sanitized = re.sub(r'-+', '-', sanitized)
+    sanitized = _DASH_RUN_RE.sub('-', sanitized)
     return sanitized
 
 
+@functools.lru_cache(maxsize=256)
 def get_claude_project_dir(project_path):
     """Get the Claude project directory for the given path"""
     dir_component = sanitize_path_for_claude(project_path)
@@ -56,108 +80,180 @@ def get_claude_project_dir(project_path):
 
 
 def find_session_files(project_path, session_id=None):
-    """Find JSONL files for the project and optional session"""
+    """Find (session_id, path) pairs for the project and optional session"""
     claude_dir = get_claude_project_dir(project_path)
     
-    if not claude_dir.exists():
-        return []
-    
     if session_id:
         # Look for specific session
         session_file = claude_dir / f"{session_id}.jsonl"
-        return [session_file] if session_file.exists() else []
+        return [(session_id, str(session_file))] if session_file.exists() else []
     
-    # Return all JSONL files
-    return list(claude_dir.glob('*.jsonl'))
+    # Return all JSONL files; a missing project directory just has none
+    try:
+        with os.scandir(claude_dir) as entries:
+            return [(entry.name[:-6], entry.path) for entry in entries
+                    if entry.name.endswith('.jsonl') and entry.is_file()]
+    except FileNotFoundError:
+        return []
 
 
 def collapse_whitespace(text):
     """Replace all whitespace sequences with single spaces"""
     if not text:
         return text
+    text = str(text)
+    # Common case: printable text (so no tabs/newlines) with no runs of
+    # spaces and nothing to trim comes back unchanged
+    if text.isprintable() and '  ' not in text and text[0] != ' ' and text[-1] != ' ':
+        return text
     # Replace all whitespace (including newlines, tabs, etc.) with single space
-    return ' '.join(str(text).split())
+    return _WS_RE.sub(' ', text).strip()
+
+
+def _fmt_bash(tool_input):
+    cmd = collapse_whitespace(tool_input.get('command', ''))
+    desc = collapse_whitespace(tool_input.get('description', ''))
+    # Truncate long commands
+    if len(cmd) > 110:
+        cmd = cmd[:107] + "..."
+    return f"$ {cmd}" + (f" # {desc}" if desc else "")
+
+
+def _fmt_read(tool_input):
+    path = collapse_whitespace(tool_input.get('file_path', ''))
+    limit = tool_input.get('limit')
+    offset = tool_input.get('offset')
+    summary = f"Read: {path}"
+    if offset:
+        summary += f" (lines {offset}-{offset + (limit or 2000)})"
+    elif limit:
+        summary += f" (first {limit} lines)"
+    return summary
+
+
+def _fmt_write(tool_input):
+    path = collapse_whitespace(tool_input.get('file_path', ''))
+    content = tool_input.get('content', '')
+    lines = content.count('\n') + 1 if content else 0
+    chars = len(content)
+    return f"Write: {path} ({lines} lines, {chars} chars)"
+
+
+def _fmt_edit(tool_input):
+    path = collapse_whitespace(tool_input.get('file_path', ''))
+    old = collapse_whitespace(tool_input.get('old_string', ''))[:30]
+    new = collapse_whitespace(tool_input.get('new_string', ''))[:30]
+    replace_all = tool_input.get('replace_all', False)
+    return f"Edit: {path} - '{old}...' → '{new}...' {'(all)' if replace_all else ''}"
+
+
+def _fmt_multiedit(tool_input):
+    path = collapse_whitespace(tool_input.get('file_path', ''))
+    edits = tool_input.get('edits', [])
+    return f"MultiEdit: {path} ({len(edits)} edits)"
+
+
+def _fmt_glob(tool_input):
+    pattern = collapse_whitespace(tool_input.get('pattern', ''))
+    path = collapse_whitespace(tool_input.get('path', ''))
+    return f"Glob: {pattern}" + (f" in {path}" if path else "")
+
+
+def _fmt_grep(tool_input):
+    pattern = collapse_whitespace(tool_input.get('pattern', ''))[:50]
+    include = collapse_whitespace(tool_input.get('include', ''))
+    return f"Grep: /{pattern}/" + (f" in {include}" if include else "")
+
+
+def _fmt_ls(tool_input):
+    path = collapse_whitespace(tool_input.get('path', ''))
+    return f"List: {path}"
+
+
+def _fmt_todowrite(tool_input):
+    todos = tool_input.get('todos', [])
+    if not todos:
+        return "Clear todos"
+    return f"Update todos ({len(todos)} items)"
+
+
+def _fmt_websearch(tool_input):
+    query = collapse_whitespace(tool_input.get('query', ''))[:50]
+    return f"Search web: {query}"
+
+
+def _fmt_webfetch(tool_input):
+    url = collapse_whitespace(tool_input.get('url', ''))
+    return f"Fetch: {url}"
+
+
+def _fmt_task(tool_input):
+    desc = collapse_whitespace(tool_input.get('description', ''))
+    prompt = collapse_whitespace(tool_input.get('prompt', ''))[:50]
+    return f"Task: {desc} - {prompt}..."
+
+
+# Summary formatter for each known tool, keyed by tool name
+_TOOL_HANDLERS = {
+    'Bash': _fmt_bash,
+    'Read': _fmt_read,
+    'Write': _fmt_write,
+    'Edit': _fmt_edit,
+    'MultiEdit': _fmt_multiedit,
+    'Glob': _fmt_glob,
+    'Grep': _fmt_grep,
+    'LS': _fmt_ls,
+    'TodoWrite': _fmt_todowrite,
+    'TodoRead': lambda tool_input: "Read todos",
+    'WebSearch': _fmt_websearch,
+    'WebFetch': _fmt_webfetch,
+    'Task': _fmt_task,
+}
+
+
+# Length of the prefix each handler above puts before the tool's arguments
+# ("$ ", "Read: ", ...); only these tools show arguments in the task tree
+_PREFIX_STRIP = {
+    'Bash': len("$ "),
+    'Read': len("Read: "),
+    'Write': len("Write: "),
+    'Edit': len("Edit: "),
+    'Grep': len("Grep: "),
+    'Glob': len("Glob: "),
+    'LS': len("List: "),
+}
 
 
 def summarize_tool_use(tool_name, tool_input):
     """Create a concise summary of a tool use"""
-    if tool_name == "Bash":
-        cmd = collapse_whitespace(tool_input.get('command', ''))
-        desc = collapse_whitespace(tool_input.get('description', ''))
-        # Truncate long commands
-        if len(cmd) > 110:
-            cmd = cmd[:107] + "..."
-        return f"$ {cmd}" + (f" # {desc}" if desc else "")
-    
-    elif tool_name == "Read":
-        path = collapse_whitespace(tool_input.get('file_path', ''))
-        limit = tool_input.get('limit')
-        offset = tool_input.get('offset')
-        summary = f"Read: {path}"
-        if offset:
-            summary += f" (lines {offset}-{offset + (limit or 2000)})"
-        elif limit:
-            summary += f" (first {limit} lines)"
-        return summary
-    
-    elif tool_name == "Write":
-        path = collapse_whitespace(tool_input.get('file_path', ''))
-        content = tool_input.get('content', '')
-        lines = content.count('\n') + 1 if content else 0
-        chars = len(content)
-        return f"Write: {path} ({lines} lines, {chars} chars)"
-    
-    elif tool_name == "Edit":
-        path = collapse_whitespace(tool_input.get('file_path', ''))
-        old = collapse_whitespace(tool_input.get('old_string', ''))[:30]
-        new = collapse_whitespace(tool_input.get('new_string', ''))[:30]
-        replace_all = tool_input.get('replace_all', False)
-        return f"Edit: {path} - '{old}...' → '{new}...' {'(all)' if replace_all else ''}"
-    
-    elif tool_name == "MultiEdit":
-        path = collapse_whitespace(tool_input.get('file_path', ''))
-        edits = tool_input.get('edits', [])
-        return f"MultiEdit: {path} ({len(edits)} edits)"
-    
-    elif tool_name == "Glob":
-        pattern = collapse_whitespace(tool_input.get('pattern', ''))
-        path = collapse_whitespace(tool_input.get('path', ''))
-        return f"Glob: {pattern}" + (f" in {path}" if path else "")
-    
-    elif tool_name == "Grep":
-        pattern = collapse_whitespace(tool_input.get('pattern', ''))[:50]
-        include = collapse_whitespace(tool_input.get('include', ''))
-        return f"Grep: /{pattern}/" + (f" in {include}" if include else "")
-    
-    elif tool_name == "LS":
-        path = collapse_whitespace(tool_input.get('path', ''))
-        return f"List: {path}"
-    
-    elif tool_name == "TodoWrite":
-        todos = tool_input.get('todos', [])
-        if not todos:
-            return "Clear todos"
-        return f"Update todos ({len(todos)} items)"
-    
-    elif tool_name == "TodoRead":
-        return "Read todos"
-    
-    elif tool_name == "WebSearch":
-        query = collapse_whitespace(tool_input.get('query', ''))[:50]
-        return f"Search web: {query}"
-    
-    elif tool_name == "WebFetch":
-        url = collapse_whitespace(tool_input.get('url', ''))
-        return f"Fetch: {url}"
-    
-    elif tool_name == "Task":
-        desc = collapse_whitespace(tool_input.get('description', ''))
-        prompt = collapse_whitespace(tool_input.get('prompt', ''))[:50]
-        return f"Task: {desc} - {prompt}..."
-    
-    else:
-        # Generic fallback
-        return f"{tool_name}: {collapse_whitespace(str(json.dumps(tool_input))[:80])}..."
+    handler = _TOOL_HANDLERS.get(tool_name)
+    if handler is not None:
+        return handler(tool_input)
+    # Generic fallback
+    return f"{tool_name}: {collapse_whitespace(str(json.dumps(tool_input))[:80])}..."
+
+
+def _stripped_head(text, length):
+    """text.strip()[:length], without copying all of a long text"""
+    window = text[:length * 4]
+    head = window.strip()
+    if len(head) < length and len(window) < len(text):
+        # Mostly whitespace up front; fall back to the whole text
+        head = text.strip()
+    return head[:length]
+
+
+def _collapsed_head(text, length):
+    """collapse_whitespace(text), cut to length chars with "..." if longer"""
+    # Collapsing a prefix gives a prefix of the fully collapsed text, so a
+    # window a few times the limit is usually all that needs collapsing
+    window = text[:length * 4]
+    collapsed = collapse_whitespace(window)
+    if len(collapsed) <= length and len(window) < len(text):
+        collapsed = collapse_whitespace(text)
+    if len(collapsed) > length:
+        return collapsed[:length - 3] + "..."
+    return collapsed
 
 
 def summarize_tool_result(tool_result):
@@ -165,15 +261,14 @@ def summarize_tool_result(tool_result):
     if isinstance(tool_result, dict):
         # Handle structured results
         if 'stdout' in tool_result:
-            stdout = tool_result.get('stdout', '').strip()
-            stderr = tool_result.get('stderr', '').strip()
+            # Only the start of the output is shown, so only that much is
+            # stripped/collapsed, however large the captured output is
+            stderr = _stripped_head(tool_result.get('stderr', ''), 80)
             if stderr:
-                return collapse_whitespace(f"Error: {stderr[:80]}...")
-            elif stdout:
-                # Collapse whitespace to keep on one line
-                collapsed = collapse_whitespace(stdout)
-                if len(collapsed) > 230:
-                    return collapsed[:227] + "..."
+                return collapse_whitespace(f"Error: {stderr}...")
+            # Collapse whitespace to keep on one line
+            collapsed = _collapsed_head(tool_result.get('stdout', ''), 230)
+            if collapsed:
                 return collapsed
         
         elif 'filenames' in tool_result:
@@ -203,86 +298,134 @@ def summarize_tool_result(tool_result):
     return result_str
 
 
-def parse_jsonl_for_tasks(jsonl_file, pattern):
-    """Parse JSONL file and find tasks matching the pattern"""
-    matches = []
-    pattern_re = re.compile(pattern, re.IGNORECASE)
+def compile_task_matcher(pattern):
+    """Build a predicate for task descriptions/prompts, or None to match every task"""
+    # The default pattern matches everything, so don't compile or run it at all
+    if pattern in ('', '.*'):
+        return None
+    # Plain ASCII text with no regex syntax is a case-insensitive substring test
+    if pattern.isascii() and not _REGEX_META_RE.search(pattern):
+        needle = pattern.lower()
+        return lambda text: needle in text.lower()
+    return re.compile(pattern, re.IGNORECASE).search
+
+
+def iter_session_tasks(jsonl_file, matcher):
+    """Yield tasks accepted by matcher (None accepts all) as their sidechains end"""
+    # Tasks still collecting sidechains; every sidechain line up to the next
+    # non-sidechain entry belongs to all of them
+    open_tasks = []
     
     try:
-        with open(jsonl_file, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-            
-        # First pass: find task descriptions matching pattern
-        task_indices = []
-        for i, line in enumerate(lines):
-            try:
-                data = json.loads(line.strip())
-                # Look for Task tool uses in assistant messages
-                if data.get('type') == 'assistant' and 'message' in data:
-                    content = data['message'].get('content', [])
-                    if isinstance(content, list):
-                        for item in content:
-                            if (isinstance(item, dict) and 
-                                item.get('type') == 'tool_use' and 
-                                item.get('name') == 'Task'):
-                                # Check both description and prompt
-                                desc = item.get('input', {}).get('description', '')
-                                prompt = item.get('input', {}).get('prompt', '')
-                                if pattern_re.search(desc) or pattern_re.search(prompt):
-                                    task_indices.append((i, data, item))
-            except:
-                continue
-        
-        # Second pass: collect sidechains for each matching task
-        for task_idx, task_data, task_item in task_indices:
-            # Find where sidechains start (after this task)
-            sidechains = []
-            
-            # Look forward from the task to find its sidechains
-            for j in range(task_idx + 1, len(lines)):
+        # Read raw bytes: the JSON parser decodes them itself
+        with open(jsonl_file, 'rb') as f:
+            for line in f:
+                # With no task collecting sidechains, only a line that starts
+                # a new task matters, and that needs a Task tool_use
+                if not open_tasks and b'"Task"' not in line:
+                    continue
                 try:
-                    data = json.loads(lines[j].strip())
+                    try:
+                        data = loads(line)
+                    except ValueError:
+                        # Possibly invalid UTF-8; replace bad bytes and retry
+                        data = loads(line.decode('utf-8', errors='replace'))
                     
-                    # Stop when we hit a non-sidechain entry
-                    if not data.get('isSidechain', False):
-                        break
+                    if data.get('isSidechain', False):
+                        # Collect sidechain entry for each task it follows
+                        if open_tasks:
+                            try:
+                                sidechain = parse_sidechain_entry(data)
+                            except:
+                                sidechain = None
+                            if sidechain:
+                                for match in open_tasks:
+                                    match['sidechains'].append(sidechain)
+                    elif open_tasks:
+                        # A non-sidechain entry ends the current run of sidechains
+                        yield from open_tasks
+                        open_tasks = []
                     
-                    # Collect sidechain entry
-                    sidechain_summary = create_sidechain_summary(data)
-                    if sidechain_summary:
-                        sidechains.append({
-                            'raw': data,
-                            'summary': sidechain_summary
-                        })
-                        
+                    # Look for Task tool uses in assistant messages
+                    if data.get('type') == 'assistant' and 'message' in data:
+                        content = data['message'].get('content', [])
+                        if isinstance(content, list):
+                            for item in content:
+                                if (isinstance(item, dict) and 
+                                    item.get('type') == 'tool_use' and 
+                                    item.get('name') == 'Task'):
+                                    # Check both description and prompt
+                                    desc = item.get('input', {}).get('description', '')
+                                    prompt = item.get('input', {}).get('prompt', '')
+                                    if matcher is None or matcher(desc) or matcher(prompt):
+                                        open_tasks.append({
+                                            'task': {
+                                                'uuid': data.get('uuid'),
+                                                'timestamp': data.get('timestamp'),
+                                                'description': item['input'].get('description', ''),
+                                                'prompt': item['input'].get('prompt', ''),
+                                                'raw': data
+                                            },
+                                            'sidechains': []
+                                        })
                 except:
                     continue
-            
-            matches.append({
-                'task': {
-                    'uuid': task_data.get('uuid'),
-                    'timestamp': task_data.get('timestamp'),
-                    'description': task_item['input'].get('description', ''),
-                    'prompt': task_item['input'].get('prompt', ''),
-                    'raw': task_data
-                },
-                'sidechains': sidechains
-            })
+        
+        yield from open_tasks
     
     except Exception as e:
         print(f"Error parsing {jsonl_file}: {e}")
-    
-    return matches
 
 
-def create_sidechain_summary(data):
-    """Create a summary for a sidechain entry"""
+def parse_jsonl_for_tasks(jsonl_file, matcher):
+    """Parse JSONL file and find tasks accepted by matcher (None accepts all)"""
+    return list(iter_session_tasks(jsonl_file, matcher))
+
+
+def _parse_with_pattern(jsonl_file, pattern):
+    """Worker entry point: rebuild the matcher from the pattern and parse one file"""
+    return parse_jsonl_for_tasks(jsonl_file, compile_task_matcher(pattern))
+
+
+def parse_session_files(session_files, pattern, matcher):
+    """Parse each session file, across worker processes when there are several
+
+    Returns one iterable of tasks per file, in the order given: lists from the
+    worker pool, or lazy iter_session_tasks() generators when parsing
+    serially, so each file's tasks can be formatted as they are found.
+    """
+    if len(session_files) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) >= 2:
+        results = parallel_map(_parse_with_pattern, session_files, [pattern] * len(session_files))
+        if results is not None:
+            return results
+    return (iter_session_tasks(session_file, matcher) for session_file in session_files)
+
+
+class Entry:
+    """A sidechain line, reduced in one walk to what the output formatters use"""
+    __slots__ = ('summary', 'details', 'result_text', 'response_text')
+    
+    def __init__(self, summary, details, result_text=None, response_text=None):
+        # Short form for the text output
+        self.summary = summary
+        # Full tool_input/tool_id/text/tool_result fields for JSON output
+        self.details = details
+        # Summary text of a tool result or an assistant response, without
+        # the "Result: "/"Response: " prefix; None for other entries
+        self.result_text = result_text
+        self.response_text = response_text
+
+
+def parse_sidechain_entry(data):
+    """Summarize a sidechain entry and pull out its full content"""
     summary = {
         'uuid': data.get('uuid'),
         'timestamp': data.get('timestamp'),
         'type': data.get('type'),
         'parent_uuid': data.get('parentUuid')
     }
+    details = {}
+    result_text = response_text = None
     
     message = data.get('message', {})
     
@@ -290,17 +433,24 @@ def create_sidechain_summary(data):
     if data['type'] == 'assistant':
         content = message.get('content', [])
         if isinstance(content, list):
+            # The first tool use or text is the summary; the last of each
+            # is what the JSON output shows in full
             for item in content:
-                if item.get('type') == 'tool_use':
+                item_type = item.get('type')
+                if item_type == 'tool_use':
                     tool_name = item.get('name')
                     tool_input = item.get('input', {})
-                    summary['action'] = summarize_tool_use(tool_name, tool_input)
-                    summary['tool'] = tool_name
-                    break
-                elif item.get('type') == 'text':
-                    text = item.get('text', '')[:100]
-                    summary['action'] = f"Response: {text}..."
-                    break
+                    details['tool_input'] = tool_input
+                    details['tool_id'] = item.get('id')
+                    if 'action' not in summary:
+                        summary['action'] = summarize_tool_use(tool_name, tool_input)
+                        summary['tool'] = tool_name
+                elif item_type == 'text':
+                    text = item.get('text', '')
+                    details['text'] = text
+                    if 'action' not in summary:
+                        response_text = f"{text[:100]}..."
+                        summary['action'] = f"Response: {response_text}"
     
     elif data['type'] == 'user':
         # Tool results
@@ -309,50 +459,58 @@ def create_sidechain_summary(data):
             for item in content:
                 if item.get('type') == 'tool_result':
                     result = data.get('toolUseResult', {})
-                    summary['action'] = f"Result: {summarize_tool_result(result)}"
+                    result_text = summarize_tool_result(result)
+                    summary['action'] = f"Result: {result_text}"
                     break
+        if 'toolUseResult' in data:
+            details['tool_result'] = data['toolUseResult']
     
-    return summary
+    return Entry(summary, details, result_text, response_text)
+
+
+@functools.lru_cache(maxsize=1024)
+def format_timestamp(timestamp):
+    """Format an ISO timestamp for display, or return it as-is if it doesn't parse"""
+    iso = timestamp if _FROMISOFORMAT_ACCEPTS_Z else timestamp.replace('Z', '+00:00')
+    try:
+        return datetime.fromisoformat(iso).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return timestamp
 
 
 def format_hierarchical_output(all_matches, project_path):
     """Format matches in hierarchical text output"""
     output = []
-    output.append(f"\n📁 Project: {project_path}")
-    output.append("=" * 80)
-    
-    if not all_matches:
-        output.append("No matching tasks found.")
-        return "\n".join(output)
-    
-    # Group by session
-    by_session = defaultdict(list)
-    for session_file, matches in all_matches:
-        session_id = Path(session_file).stem
-        by_session[session_id].extend(matches)
-    
-    for session_id, session_matches in by_session.items():
-        output.append(f"\n📂 Session: {session_id}")
-        output.append("-" * 60)
-        
-        for i, match in enumerate(session_matches, 1):
+    append = output.append
+    append(f"\n📁 Project: {project_path}")
+    append(_SEP80)
+    
+    # Matches are consumed as they are parsed, so totals are kept as we go
+    sessions = 0
+    total_tasks = 0
+    total_sidechains = 0
+    
+    for session_id, session_file, session_matches in all_matches:
+        for task_num, match in enumerate(session_matches, 1):
+            if task_num == 1:
+                # A session only gets a header once it has a matching task
+                sessions += 1
+                append(f"\n📂 Session: {session_id}")
+                append(_SEP60)
+            
             task = match['task']
             sidechains = match['sidechains']
             
             # Format timestamp
             timestamp = task.get('timestamp', '')
             if timestamp:
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    timestamp_str = dt.strftime('%Y-%m-%d %H:%M:%S')
-                except:
-                    timestamp_str = timestamp
+                timestamp_str = format_timestamp(timestamp) if isinstance(timestamp, str) else timestamp
             else:
                 timestamp_str = 'Unknown time'
             
-            output.append(f"\n  🎯 Task {i}: {task.get('description', 'No description')}")
-            output.append(f"     ID: {task.get('uuid', 'Unknown')[:8]}...")
-            output.append(f"     Time: {timestamp_str}")
+            append(f"\n  🎯 Task {task_num}: {task.get('description', 'No description')}")
+            append(f"     ID: {task.get('uuid', 'Unknown')[:8]}...")
+            append(f"     Time: {timestamp_str}")
             
             # Show prompt preview
             prompt = task.get('prompt', '')
@@ -360,81 +518,74 @@ def format_hierarchical_output(all_matches, project_path):
                 prompt_preview = prompt[:100].replace('\n', ' ')
                 if len(prompt) > 100:
                     prompt_preview += "..."
-                output.append(f"     Prompt: {prompt_preview}")
+                append(f"     Prompt: {prompt_preview}")
             
             # Show sidechains
             if sidechains:
-                output.append(f"     Actions ({len(sidechains)}):")
+                append(f"     Actions ({len(sidechains)}):")
                 
                 # Track action numbers across tool calls and results
                 action_num = 1
                 i = 0
                 while i < len(sidechains):
                     sidechain = sidechains[i]
-                    summary = sidechain['summary']
+                    summary = sidechain.summary
                     tool_name = summary.get('tool')
                     
                     if tool_name:
                         # This is a tool call
                         action = summary.get('action', 'Unknown action')
-                        # Extract just the command/content part for cleaner display
-                        if action.startswith('$ '):
-                            tool_display = f"{tool_name}({action[2:]})"
-                        elif action.startswith('Read: '):
-                            tool_display = f"{tool_name}({action[6:]})"
-                        elif action.startswith('Write: '):
-                            tool_display = f"{tool_name}({action[7:]})"
-                        elif action.startswith('Edit: '):
-                            tool_display = f"{tool_name}({action[6:]})"
-                        elif action.startswith('Grep: '):
-                            tool_display = f"{tool_name}({action[6:]})"
-                        elif action.startswith('Glob: '):
-                            tool_display = f"{tool_name}({action[6:]})"
-                        elif action.startswith('List: '):
-                            tool_display = f"{tool_name}({action[6:]})"
+                        # Strip the summary's prefix for tools whose summary
+                        # reads well as call arguments
+                        prefix_len = _PREFIX_STRIP.get(tool_name)
+                        if prefix_len is not None:
+                            tool_display = f"{tool_name}({action[prefix_len:]})"
                         else:
                             tool_display = f"{tool_name}(...)"
                         
-                        output.append(f"       {action_num}. {tool_display}")
+                        append(f"       {action_num}. {tool_display}")
                         
                         # Look for the next result
                         if i + 1 < len(sidechains):
-                            next_summary = sidechains[i + 1]['summary']
-                            if next_summary.get('action', '').startswith('Result: '):
-                                result = next_summary['action'][8:]  # Remove "Result: " prefix
+                            result = sidechains[i + 1].result_text
+                            if result is not None:
                                 # Collapse all whitespace to single spaces
                                 result = collapse_whitespace(result)
                                 if len(result) > 130:
                                     result = result[:127] + "..."
-                                output.append(f"          → {result}")
+                                append(f"          → {result}")
                                 i += 1  # Skip the result in the next iteration
                         
                         action_num += 1
-                    elif summary.get('action', '').startswith('Response: '):
+                    elif sidechain.response_text is not None:
                         # Assistant response
-                        response = summary['action'][10:]  # Remove "Response: " prefix
+                        response = sidechain.response_text
                         # Format response with proper indentation
                         if len(response) > 70:
                             # Split longer responses
-                            output.append(f"       {action_num}. Response:")
-                            output.append(f"          {response}")
+                            append(f"       {action_num}. Response:")
+                            append(f"          {response}")
                         else:
-                            output.append(f"       {action_num}. Response: {response}")
+                            append(f"       {action_num}. Response: {response}")
                         action_num += 1
                     
                     i += 1
             else:
-                output.append("     Actions: None")
+                append("     Actions: None")
+            
+            total_tasks += 1
+            total_sidechains += len(sidechains)
     
-    # Summary
-    total_tasks = sum(len(matches) for _, matches in all_matches)
-    total_sidechains = sum(len(m['sidechains']) for _, matches in all_matches for m in matches)
+    if not total_tasks:
+        append("No matching tasks found.")
+        return "\n".join(output)
     
-    output.append(f"\n📊 Summary")
-    output.append("-" * 20)
-    output.append(f"Sessions analyzed: {len(by_session)}")
-    output.append(f"Matching tasks: {total_tasks}")
-    output.append(f"Total actions: {total_sidechains}")
+    # Summary
+    append(f"\n📊 Summary")
+    append(_SEP20)
+    append(f"Sessions analyzed: {sessions}")
+    append(f"Matching tasks: {total_tasks}")
+    append(f"Total actions: {total_sidechains}")
     
     return "\n".join(output)
 
@@ -443,7 +594,7 @@ def format_json_output(all_matches):
     """Format matches as JSON output"""
     result = []
     
-    for session_file, matches in all_matches:
+    for session_id, session_file, matches in all_matches:
         for match in matches:
             # Build clean JSON structure
             task_obj = {
@@ -451,16 +602,14 @@ def format_json_output(all_matches):
                 'timestamp': match['task'].get('timestamp'),
                 'description': match['task'].get('description'),
                 'prompt': match['task'].get('prompt'),
-                'session_id': Path(session_file).stem,
-                'session_file': str(session_file)
+                'session_id': session_id,
+                'session_file': session_file
             }
             
             # Include full sidechain data without truncation
             sidechains = []
             for sc in match['sidechains']:
-                # Get the raw data for complete information
-                raw_data = sc['raw']
-                summary = sc['summary']
+                summary = sc.summary
                 
                 sidechain_obj = {
                     'uuid': summary.get('uuid'),
@@ -471,21 +620,8 @@ def format_json_output(all_matches):
                     'action': summary.get('action'),  # Keep summary for reference
                 }
                 
-                # Add full content based on type
-                message = raw_data.get('message', {})
-                if raw_data['type'] == 'assistant':
-                    content = message.get('content', [])
-                    if isinstance(content, list):
-                        for item in content:
-                            if item.get('type') == 'tool_use':
-                                sidechain_obj['tool_input'] = item.get('input', {})
-                                sidechain_obj['tool_id'] = item.get('id')
-                            elif item.get('type') == 'text':
-                                sidechain_obj['text'] = item.get('text', '')
-                elif raw_data['type'] == 'user':
-                    # Tool results
-                    if 'toolUseResult' in raw_data:
-                        sidechain_obj['tool_result'] = raw_data['toolUseResult']
+                # Add full content gathered while parsing
+                sidechain_obj.update(sc.details)
                 
                 sidechains.append(sidechain_obj)
             
@@ -494,7 +630,7 @@ def format_json_output(all_matches):
                 'sidechains': sidechains
             })
     
-    return json.dumps(result, indent=2, cls=SafeJSONEncoder)
+    return dumps(result, indent=True, default=_json_default).decode('utf-8')
 
 
 def command(manager, args):
@@ -509,6 +645,9 @@ def command(manager, args):
             'message': 'Project path must be absolute'
         }
     
+    # Compile the pattern once for all session files
+    matcher = compile_task_matcher(parsed.regex)
+    
     # Find session files
     session_files = find_session_files(project_path, parsed.session)
     if not session_files:
@@ -518,11 +657,9 @@ def command(manager, args):
         }
     
     # Parse each session file
-    all_matches = []
-    for session_file in session_files:
-        matches = parse_jsonl_for_tasks(session_file, parsed.regex)
-        if matches:
-            all_matches.append((session_file, matches))
+    paths = [path for _, path in session_files]
+    all_matches = ((session_id, path, matches) for (session_id, path), matches
+                   in zip(session_files, parse_session_files(paths, parsed.regex, matcher)))
     
     # Format output
     if parsed.json:
@@ -20,25 +20,25 @@ def get_manager_pid():
     """Get manager PID from .pid file or return None if not found"""
     pid_file = Path('.pid')
     
-    if not pid_file.exists():
+    # One open/read/close; a missing file just means no manager
+    try:
+        pid_str = pid_file.read_text().strip()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # Unreadable pid file
+        pid_file.unlink(missing_ok=True)
+        return None
+    
+    if not pid_str:
         return None
     
     try:
-        with open(pid_file, 'r') as f:
-            pid_str = f.read().strip()
-            if pid_str:
-                pid = int(pid_str)
-                # Verify process is actually running
-                try:
-                    os.kill(pid, 0)  # Signal 0 checks if process exists
-                    return pid
-                except (OSError, ProcessLookupError):
-                    # Process doesn't exist, clean up stale pid file
-                    pid_file.unlink(missing_ok=True)
-                    return None
-            return None
-    except (ValueError, IOError):
-        # Invalid or unreadable pid file
+        pid = int(pid_str)
+        os.kill(pid, 0)  # Signal 0 checks if process exists
+        return pid
+    except (ValueError, OSError):
+        # Invalid pid or process doesn't exist, clean up stale pid file
         pid_file.unlink(missing_ok=True)
         return None
 
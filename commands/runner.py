@@ -10,7 +10,6 @@ Examples:
 """
 import subprocess
 import argparse
-import json
 import threading
 import queue
 import os
@@ -20,8 +19,66 @@ from pathlib import Path
 import time
 import pty
 import select
+import selectors
 import fcntl
 import shutil
+import shlex
+from collections import Counter, deque
+
+from commands._fastjson import dumps, loads
+
+# Only these message types feed the report (tool uses, usage, model, init
+# tools, final result); anything else -- mostly tool results echoed back as
+# user messages -- is logged without being parsed
+_PARSE_MARKERS = (b'"assistant"', b'"result"', b'"init"')
+
+# Canonical objects for the message types the parser acts on. Parsed values
+# are looked up here once per line and then matched by identity; other
+# types map to None.
+_SYSTEM = 'system'
+_ASSISTANT = 'assistant'
+_RESULT = 'result'
+_MESSAGE_TYPES = {t: t for t in (_SYSTEM, _ASSISTANT, _RESULT)}
+
+# How much of Claude's stdout to read per syscall
+STREAM_CHUNK_SIZE = 65536
+
+# The stream log is written once this much is pending, or once the oldest
+# pending output is this many seconds old
+LOG_FLUSH_BYTES = 65536
+LOG_FLUSH_DELAY = 0.1
+
+# Most buffers a single writev() call accepts
+IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+
+# Seconds between pushes of a running parser's totals into process_info
+PROGRESS_INTERVAL = 0.5
+
+# Seconds the reader gets to drain Claude's pipes after it exits before the
+# report is written anyway (a grandchild may hold them open indefinitely)
+READER_DRAIN_TIMEOUT = 2
+
+# Most recent stderr lines kept for the report; the log has all of them
+STDERR_REPORT_LINES = 1000
+
+# Arguments and environment overrides shared by every runner
+CLAUDE_BASE_ARGS = ('--verbose', '--output-format', 'stream-json')
+RUNNER_BASE_ENV = {'PYTHONUNBUFFERED': '1', 'TERM': 'xterm-256color'}
+# setup_info fields handed to the wrapper script, and the variables they go in
+SETUP_ENV_VARS = (
+    ('nvm_dir', 'CLAUDECONTROLLER_NVM_DIR'),
+    ('nvm_script', 'CLAUDECONTROLLER_NVM_SCRIPT'),
+    ('node_path', 'CLAUDECONTROLLER_NODE_PATH'),
+    ('claude_path', 'CLAUDECONTROLLER_CLAUDE_PATH'),
+)
+
+# Node setups whose claude can be run without the wrapper script: the others
+# (asdf, fnm, volta) need it to source or eval their environment first
+DIRECT_NODE_TYPES = frozenset(('system', 'unknown', 'n', 'nvm'))
+
+# Auto-detected node setups: (PATH, NVM_DIR) -> (monotonic time, setup info)
+NODE_SETUP_TTL = 60
+_SETUP_CACHE: Dict[tuple, tuple] = {}
 
 def detect_node_setup(config: Dict[str, Any]) -> Dict[str, Any]:
     """Detect Node.js and Claude setup"""
@@ -37,7 +94,20 @@ def detect_node_setup(config: Dict[str, Any]) -> Dict[str, Any]:
             'claude_path': config.get('claude_path')
         }
     
-    # Auto-detect setup
+    # Auto-detection stats and may fork bash, so reuse a recent result for
+    # the same search environment
+    key = (os.environ.get('PATH', ''), os.environ.get('NVM_DIR', ''))
+    now = time.monotonic()
+    cached = _SETUP_CACHE.get(key)
+    if cached and now - cached[0] < NODE_SETUP_TTL:
+        return dict(cached[1])
+    
+    info = auto_detect_node_setup()
+    _SETUP_CACHE[key] = (now, info)
+    return dict(info)
+
+def auto_detect_node_setup() -> Dict[str, Any]:
+    """Search the system for Node.js and Claude"""
     info = {
         'type': 'unknown',
         'nvm_dir': None,
@@ -132,44 +202,181 @@ def get_parser():
 
 def parse_stream_line(line: str) -> Optional[Dict[str, Any]]:
     """Parse a line from the Claude JSON stream"""
+    # Both parsers skip the surrounding whitespace/newline themselves, and
+    # orjson.JSONDecodeError is a ValueError like json's
     try:
-        return json.loads(line.strip())
-    except json.JSONDecodeError:
+        return loads(line)
+    except ValueError:
         return None
 
-def stderr_reader(proc: subprocess.Popen, error_log, report_data):
-    """Read stderr output"""
-    stderr_lines = []
-    try:
-        for line in proc.stderr:
-            error_log.write(f"[STDERR] {line}")
-            error_log.flush()
-            stderr_lines.append(line.strip())
-    except Exception as e:
-        error_log.write(f"[STDERR ERROR] {str(e)}\n")
+def write_all(fd: int, data):
+    """os.write() all of data, continuing after short writes"""
+    with memoryview(data) as view:
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+
+def writev_all(fd: int, pieces: list):
+    """os.writev() every piece in order, continuing after short writes"""
+    while pieces:
+        written = os.writev(fd, pieces[:IOV_MAX])
+        # Drop the pieces that went out whole and trim one that went out in part
+        done = 0
+        while done < len(pieces) and written >= len(pieces[done]):
+            written -= len(pieces[done])
+            done += 1
+        del pieces[:done]
+        if written:
+            pieces[0] = memoryview(pieces[0])[written:]
+
+class BufferedLog:
+    """Append-only log file that batches writes into few writev() calls"""
+    
+    def __init__(self, path, max_bytes: int = LOG_FLUSH_BYTES, max_delay: float = LOG_FLUSH_DELAY):
+        # O_APPEND keeps each write whole even with other writers on the file
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND | os.O_CLOEXEC, 0o666)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        # Pending chunks are kept as written and handed to writev() as-is,
+        # rather than copied together into one buffer
+        self._pieces = []
+        self._pending = 0
+        self._pending_since = 0.0
+        self._lock = threading.Lock()
+    
+    def write(self, data: bytes):
+        with self._lock:
+            if self.fd is None:
+                # Closed while a reader was still running: drop the output
+                return
+            now = time.monotonic()
+            if not self._pieces:
+                self._pending_since = now
+            self._pieces.append(data)
+            self._pending += len(data)
+            if self._pending >= self.max_bytes or now - self._pending_since >= self.max_delay:
+                self._write_pending()
+    
+    def time_left(self) -> Optional[float]:
+        """Seconds until pending output is due to be written, or None if there is none"""
+        with self._lock:
+            if not self._pieces:
+                return None
+            return max(0.0, self._pending_since + self.max_delay - time.monotonic())
+    
+    def flush(self):
+        with self._lock:
+            if self.fd is not None:
+                self._write_pending()
     
-    # Store stderr in report data
-    if stderr_lines:
-        report_data['stderr'] = '\n'.join(stderr_lines)
+    def close(self):
+        with self._lock:
+            if self.fd is None:
+                return
+            self._write_pending()
+            os.close(self.fd)
+            self.fd = None
+    
+    def _write_pending(self):
+        writev_all(self.fd, self._pieces)
+        self._pending = 0
+
+def split_lines(chunk: bytes, partial: list) -> tuple:
+    """Split a chunk into complete lines, carrying an unfinished last line in partial
+    
+    Returns the bytes up to and including the chunk's last newline (prefixed
+    with any carried-over start of the first line) and those lines without
+    their newlines.
+    """
+    last = chunk.rfind(b'\n') + 1
+    if not last:
+        partial.append(chunk)
+        return b'', []
+    if partial:
+        partial.append(chunk[:last])
+        complete = b''.join(partial)
+        partial.clear()
+    else:
+        complete = chunk[:last] if last < len(chunk) else chunk
+    if last < len(chunk):
+        partial.append(chunk[last:])
+    return complete, complete.split(b'\n')[:-1]
+
+def iter_stream_lines(proc: subprocess.Popen, stream_log: BufferedLog, stderr_lines: deque):
+    """Yield Claude's stdout lines, logging both pipes and keeping stderr lines
+    
+    One selector serves stdout and stderr, so a runner needs a single reader
+    thread. Only complete lines are logged, so output from the two pipes never
+    interleaves mid-line.
+    """
+    stdout_fd = proc.stdout.fileno()
+    sel = selectors.DefaultSelector()
+    # Each pipe's data is the list of pieces of its unfinished line
+    sel.register(stdout_fd, selectors.EVENT_READ, [])
+    sel.register(proc.stderr.fileno(), selectors.EVENT_READ, [])
+    try:
+        while sel.get_map():
+            events = sel.select(stream_log.time_left())
+            if not events:
+                # Claude is quiet: don't leave logged output unwritten
+                stream_log.flush()
+                continue
+            
+            for key, _ in events:
+                partial = key.data
+                chunk = os.read(key.fd, STREAM_CHUNK_SIZE)
+                if chunk:
+                    complete, lines = split_lines(chunk, partial)
+                elif partial:
+                    # The pipe closed without a final newline
+                    sel.unregister(key.fd)
+                    complete = b''.join(partial)
+                    lines = [complete]
+                else:
+                    sel.unregister(key.fd)
+                    continue
+                
+                if key.fd == stdout_fd:
+                    if complete:
+                        stream_log.write(complete)
+                    yield from lines
+                elif lines:
+                    stream_log.write(b''.join(b"[STDERR] " + line + b"\n" for line in lines))
+                    stderr_lines.extend(line.strip().decode('utf-8', 'replace') for line in lines)
+    finally:
+        sel.close()
+
+def write_report(path, report_data: Dict[str, Any]):
+    """Write the runner report as indented JSON in a single write"""
+    data = dumps(report_data, indent=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o666)
+    try:
+        write_all(fd, data)
+    finally:
+        os.close(fd)
 
 def stream_parser(proc: subprocess.Popen, stream_log, report_data: Dict[str, Any], 
                  process_name: str, manager):
     """Parse the streaming output from Claude"""
-    tool_counts = {}
-    start_time = time.time()
+    # Totals live in locals and reach process_info in one update() per
+    # PROGRESS_INTERVAL, plus a final one
+    tool_counts = Counter()
+    next_progress = time.monotonic() + PROGRESS_INTERVAL
+    start_time = time.monotonic()
     session_id = None
     model = None
     total_input_tokens = 0
     total_output_tokens = 0
+    stderr_lines = deque(maxlen=STDERR_REPORT_LINES)
     
     try:
-        stream_log.write("[DEBUG] Stream parser started\n")
-        stream_log.flush()
+        stream_log.write(b"[DEBUG] Stream parser started\n")
         
-        for line in proc.stdout:
-            # Write to stream log
-            stream_log.write(line)
-            stream_log.flush()
+        for line in iter_stream_lines(proc, stream_log, stderr_lines):
+            # Only parse lines that can carry something we track; the first
+            # line is always parsed for the session id
+            if session_id and not any(marker in line for marker in _PARSE_MARKERS):
+                continue
             
             # Parse JSON
             data = parse_stream_line(line)
@@ -182,11 +389,12 @@ def stream_parser(proc: subprocess.Popen, stream_log, report_data: Dict[str, Any
                 report_data['session_id'] = session_id
             
             # Track system init
-            if data.get('type') == 'system' and data.get('subtype') == 'init':
+            msg_type = _MESSAGE_TYPES.get(data.get('type'))
+            if msg_type is _SYSTEM and data.get('subtype') == 'init':
                 report_data['tools_available'] = data.get('tools', [])
             
             # Track tool usage and tokens
-            elif data.get('type') == 'assistant':
+            elif msg_type is _ASSISTANT:
                 message = data.get('message', {})
                 
                 # Get model info
@@ -194,12 +402,12 @@ def stream_parser(proc: subprocess.Popen, stream_log, report_data: Dict[str, Any
                     model = message['model']
                     report_data['model'] = model
                 
-                # Track tool usage
-                content = message.get('content', [])
-                for item in content:
-                    if item.get('type') == 'tool_use':
-                        tool_name = item.get('name', 'unknown')
-                        tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+                # Track tool usage; a message whose raw line never mentions
+                # tool_use (plain text or thinking) has no blocks to count
+                if b'"tool_use"' in line:
+                    for item in message.get('content', []):
+                        if item.get('type') == 'tool_use':
+                            tool_counts[item.get('name', 'unknown')] += 1
                 
                 # Update token usage
                 usage = message.get('usage', {})
@@ -210,7 +418,7 @@ def stream_parser(proc: subprocess.Popen, stream_log, report_data: Dict[str, Any
                     total_output_tokens += usage.get('output_tokens', 0)
             
             # Check for final result
-            elif data.get('type') == 'result':
+            elif msg_type is _RESULT:
                 report_data['status'] = data.get('subtype', 'unknown')
                 report_data['result'] = data.get('result', '')
                 report_data['cost_usd'] = data.get('cost_usd', 0)
@@ -219,6 +427,20 @@ def stream_parser(proc: subprocess.Popen, stream_log, report_data: Dict[str, Any
                 report_data['duration_api_ms'] = data.get('duration_api_ms', 0)
                 report_data['num_turns'] = data.get('num_turns', 0)
                 report_data['is_error'] = data.get('is_error', False)
+            
+            # Let runner-status see totals while the run is in progress
+            now = time.monotonic()
+            if now >= next_progress:
+                next_progress = now + PROGRESS_INTERVAL
+                info = manager.process_info.get(process_name)
+                if info is not None:
+                    info.update({
+                        'tool_counts': dict(tool_counts),
+                        'total_tokens': total_input_tokens + total_output_tokens,
+                        'total_input_tokens': total_input_tokens,
+                        'total_output_tokens': total_output_tokens,
+                        'model': model
+                    })
     
     except Exception as e:
         report_data['error'] = str(e)
@@ -227,8 +449,11 @@ def stream_parser(proc: subprocess.Popen, stream_log, report_data: Dict[str, Any
     
     finally:
         # Update final metrics
+        if stderr_lines:
+            report_data['stderr'] = '\n'.join(stderr_lines)
+        tool_counts = dict(tool_counts)
         report_data['tool_counts'] = tool_counts
-        report_data['duration'] = time.time() - start_time
+        report_data['duration'] = time.monotonic() - start_time
         report_data['total_input_tokens'] = total_input_tokens
         report_data['total_output_tokens'] = total_output_tokens
         report_data['total_tokens'] = total_input_tokens + total_output_tokens
@@ -258,16 +483,13 @@ def command(manager, args: list) -> Dict[str, Any]:
     # Build the prompt
     prompt = parsed_args.prompt
     if parsed_args.context_file:
-        try:
-            context_path = Path(parsed_args.context_file)
-            if not context_path.exists():
-                return {'success': False, 'error': f'Context file not found: {parsed_args.context_file}'}
-            
-            with open(context_path, 'r') as f:
-                context = f.read()
-            prompt = f"@{parsed_args.context_file}\n{prompt}"
-        except Exception as e:
-            return {'success': False, 'error': f'Error reading context file: {str(e)}'}
+        # Claude reads the file itself via the @path reference, so only check
+        # that it's there and readable
+        if not os.path.exists(parsed_args.context_file):
+            return {'success': False, 'error': f'Context file not found: {parsed_args.context_file}'}
+        if not os.access(parsed_args.context_file, os.R_OK):
+            return {'success': False, 'error': f'Context file not readable: {parsed_args.context_file}'}
+        prompt = f"@{parsed_args.context_file}\n{prompt}"
     
     # Add report request if specified
     if parsed_args.report:
@@ -281,44 +503,34 @@ def command(manager, args: list) -> Dict[str, Any]:
     # Detect Node/Claude setup
     setup_info = detect_node_setup(node_setup)
     
-    # Build Claude command
-    claude_cmd_parts = ['claude', '-p', prompt, '--verbose', '--output-format', 'stream-json']
-    
-    if parsed_args.model:
-        claude_cmd_parts.extend(['--model', parsed_args.model])
-    
-    if use_dangerous_perms and not parsed_args.no_permissions:
-        claude_cmd_parts.append('--dangerously-skip-permissions')
-    
-    # Escape the prompt for shell using shlex
-    import shlex
-    escaped_prompt = shlex.quote(prompt)
-    
-    # Build command with proper escaping
-    claude_args = ['--verbose', '--output-format', 'stream-json']
+    # Build Claude arguments
+    claude_args = list(CLAUDE_BASE_ARGS)
     if parsed_args.model:
         claude_args.extend(['--model', parsed_args.model])
     if use_dangerous_perms and not parsed_args.no_permissions:
         claude_args.append('--dangerously-skip-permissions')
     
     # Setup environment variables for wrapper
-    env_vars = {
-        'CLAUDECONTROLLER_NODE_TYPE': setup_info.get('type', 'unknown'),
-    }
-    
-    if setup_info.get('nvm_dir'):
-        env_vars['CLAUDECONTROLLER_NVM_DIR'] = setup_info['nvm_dir']
-    if setup_info.get('nvm_script'):
-        env_vars['CLAUDECONTROLLER_NVM_SCRIPT'] = setup_info['nvm_script']
-    if setup_info.get('node_path'):
-        env_vars['CLAUDECONTROLLER_NODE_PATH'] = setup_info['node_path']
-    if setup_info.get('claude_path'):
-        env_vars['CLAUDECONTROLLER_CLAUDE_PATH'] = setup_info['claude_path']
+    env_vars = {var: setup_info[key] for key, var in SETUP_ENV_VARS if setup_info.get(key)}
+    env_vars['CLAUDECONTROLLER_NODE_TYPE'] = setup_info.get('type', 'unknown')
     
-    # Use the claude wrapper script
-    wrapper_path = Path(__file__).parent.parent / 'scripts' / 'claude-wrapper.sh'
-    claude_cmd = f"{wrapper_path} -p {escaped_prompt} {' '.join(claude_args)}"
-    full_command = claude_cmd  # Run directly without bash -c
+    # Run claude directly when we know where it is and its node needs no
+    # setup beyond PATH; otherwise let the wrapper script set up the node
+    # environment and find it. Neither goes through a shell, so the prompt
+    # needs no quoting.
+    claude_path = setup_info.get('claude_path')
+    path_prefix = None
+    if (claude_path and setup_info.get('type') in DIRECT_NODE_TYPES
+            and os.access(claude_path, os.X_OK)):
+        argv = [claude_path, '-p', prompt] + claude_args
+        # Sourcing nvm.sh would have put this node's bin directory first on
+        # PATH; claude's '#!/usr/bin/env node' launcher needs that node
+        if setup_info.get('type') == 'nvm':
+            path_prefix = os.path.dirname(claude_path)
+    else:
+        wrapper_path = Path(__file__).parent.parent / 'scripts' / 'claude-wrapper.sh'
+        argv = ['/bin/bash', str(wrapper_path), '-p', prompt] + claude_args
+    full_command = shlex.join(argv)
     
     # Set up logging
     log_dir = Path(__file__).parent.parent / 'logs' / 'claude'
@@ -328,19 +540,15 @@ def command(manager, args: list) -> Dict[str, Any]:
     
     try:
         # Start the process
-        # Set unbuffered output and add our env vars
-        env = os.environ.copy()
-        env['PYTHONUNBUFFERED'] = '1'
-        env['TERM'] = 'xterm-256color'
-        env.update(env_vars)  # Add our setup variables
+        # Set unbuffered output and add our env vars, in one dict build
+        env = {**os.environ, **RUNNER_BASE_ENV, **env_vars}
+        if path_prefix:
+            env['PATH'] = path_prefix + os.pathsep + env.get('PATH', '')
         
         proc = subprocess.Popen(
-            full_command,
-            shell=True,
+            argv,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True,
-            bufsize=0,  # Unbuffered
             env=env
         )
         
@@ -367,34 +575,59 @@ def command(manager, args: list) -> Dict[str, Any]:
         }
         
         # Open log file and keep it open
-        stream_log = open(stream_log_path, 'w')
+        stream_log = BufferedLog(stream_log_path)
         
         # Write initial debug info
-        stream_log.write(f"[DEBUG] Command: {full_command}\n")
-        stream_log.write(f"[DEBUG] Started at: {datetime.now().isoformat()}\n")
-        stream_log.flush()
+        stream_log.write(f"[DEBUG] Command: {full_command}\n".encode())
+        stream_log.write(f"[DEBUG] Started at: {datetime.now().isoformat()}\n".encode())
         
-        # Start stream parser in background
+        # The report is written once the process has exited and the reader
+        # has drained its pipes, by whichever of the two finishes last, or
+        # READER_DRAIN_TIMEOUT seconds after the exit if the reader hasn't
+        pending = [2]
+        pending_lock = threading.Lock()
+        
+        def finish_part(force=False):
+            with pending_lock:
+                if not pending[0]:
+                    return
+                pending[0] = 0 if force else pending[0] - 1
+                if pending[0]:
+                    return
+            
+            # Close log file
+            stream_log.close()
+            
+            # Write final report
+            write_report(report_log_path, report_data)
+        
+        def process_exited():
+            finish_part()
+            if pending[0]:
+                drain_timer = threading.Timer(READER_DRAIN_TIMEOUT, finish_part, kwargs={'force': True})
+                drain_timer.daemon = True
+                drain_timer.start()
+        
+        def read_then_finish(reader, *reader_args):
+            try:
+                reader(*reader_args)
+            finally:
+                finish_part()
+        
+        # Start stream parser (which also captures stderr) in background
         parser_thread = threading.Thread(
-            target=stream_parser,
-            args=(proc, stream_log, report_data, process_name, manager)
+            target=read_then_finish,
+            args=(stream_parser, proc, stream_log, report_data, process_name, manager)
         )
         parser_thread.daemon = True
         parser_thread.start()
         
-        # Also capture stderr
-        stderr_thread = threading.Thread(
-            target=stderr_reader,
-            args=(proc, stream_log, report_data)
-        )
-        stderr_thread.daemon = True
-        stderr_thread.start()
-        
         # Store process info
         manager.processes[process_name] = proc
         manager.process_info[process_name] = {
             'command': full_command,
             'started': datetime.now().isoformat(),
+            'started_monotonic': time.monotonic(),
             'type': 'claude',
             'pid': proc.pid,
             'prompt': parsed_args.prompt,
@@ -404,27 +637,30 @@ def command(manager, args: list) -> Dict[str, Any]:
             'report_log': str(report_log_path),
             'report_data': report_data
         }
+        manager.claude_runners[process_name] = manager.process_info[process_name]
         
-        # Monitor process and write report when done
-        def monitor_process():
-            proc.wait()
-            report_data['ended'] = datetime.now().isoformat()
-            report_data['return_code'] = proc.returncode
-            
-            # Wait for parser threads to finish
-            parser_thread.join(timeout=2)
-            stderr_thread.join(timeout=2)
-            
-            # Close log file
-            stream_log.close()
-            
-            # Write final report
-            with open(report_log_path, 'w') as f:
-                json.dump(report_data, f, indent=2)
+        # Let the manager's shared pidfd watcher report the exit instead of
+        # parking a thread in wait() for every runner
+        def on_exit(info):
+            report_data['ended'] = info['ended']
+            report_data['return_code'] = info['returncode']
+            process_exited()
         
-        monitor_thread = threading.Thread(target=monitor_process)
-        monitor_thread.daemon = True
-        monitor_thread.start()
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except (AttributeError, OSError):
+            # No pidfd support: wait for the exit on a thread of our own
+            def monitor_process():
+                proc.wait()
+                report_data['ended'] = datetime.now().isoformat()
+                report_data['return_code'] = proc.returncode
+                process_exited()
+            
+            monitor_thread = threading.Thread(target=monitor_process)
+            monitor_thread.daemon = True
+            monitor_thread.start()
+        else:
+            manager.register_pidfd(process_name, pidfd, on_exit)
         
         return {
             'success': True,
@@ -13,11 +13,13 @@ Shows:
 import argparse
 from datetime import datetime
 from typing import Dict, Any
-import json
 import time
 import os
-from pathlib import Path
-import subprocess
+
+from commands._fastjson import loads
+
+# Bytes read per step when looking for the start of a stream log's last line
+TAIL_BLOCK_SIZE = 65536
 
 def get_parser():
     """Get argument parser for this command"""
@@ -53,27 +55,42 @@ def format_tool_counts(tool_counts: Dict[str, int]) -> str:
     
     return ", ".join(items)
 
+def read_last_line(fd: int, size: int) -> bytes:
+    """Return the last line of an open file, like tail -n 1, reading from the end"""
+    pos = size
+    blocks = []
+    while pos > 0:
+        step = min(TAIL_BLOCK_SIZE, pos)
+        pos -= step
+        block = os.pread(fd, step, pos)
+        blocks.append(block)
+        # The newline that ends the file closes the last line, not starts it
+        search_end = step - 1 if pos + step == size else step
+        start = block.rfind(b'\n', 0, search_end)
+        if start >= 0:
+            blocks[-1] = block[start + 1:]
+            break
+    return b''.join(reversed(blocks))
+
 def get_last_stream_line(stream_log_path: str) -> tuple:
     """Get last line and modification time of stream log"""
     try:
-        path = Path(stream_log_path)
-        if not path.exists():
+        try:
+            fd = os.open(stream_log_path, os.O_RDONLY | os.O_CLOEXEC)
+        except FileNotFoundError:
             return None, None
-            
-        # Get modification time
-        mtime = datetime.fromtimestamp(path.stat().st_mtime)
-        
-        # Get last line using tail command (efficient for large files)
-        result = subprocess.run(
-            ['tail', '-n', '1', stream_log_path],
-            capture_output=True, text=True
-        )
-        
-        if result.returncode == 0 and result.stdout.strip():
-            last_line = result.stdout.strip()
+        try:
+            # Get modification time and last line from the same open file
+            st = os.fstat(fd)
+            mtime = datetime.fromtimestamp(st.st_mtime)
+            last_line = read_last_line(fd, st.st_size).decode('utf-8', errors='replace').strip()
+        finally:
+            os.close(fd)
+        
+        if last_line:
             # Try to parse as JSON and extract meaningful info
             try:
-                data = json.loads(last_line)
+                data = loads(last_line)
                 # Extract the most relevant info based on type
                 if data.get('type') == 'assistant':
                     content = data.get('message', {}).get('content', [])
@@ -107,54 +124,59 @@ def command(manager, args: list) -> Dict[str, Any]:
     
     # Collect runner processes
     runners = {}
-    for name, info in manager.process_info.items():
-        if info.get('type') == 'claude':
-            if parsed_args.name and not name.startswith(parsed_args.name):
-                continue
-            
-            proc = manager.processes.get(name)
-            
-            # Calculate duration
+    now_mono = time.monotonic()
+    for name, info in manager.claude_runners.items():
+        if parsed_args.name and not name.startswith(parsed_args.name):
+            continue
+        
+        proc = manager.processes.get(name)
+        
+        # Calculate duration; runners started before monotonic times
+        # were recorded only have the ISO timestamp
+        started_mono = info.get('started_monotonic')
+        if started_mono is not None:
+            duration = now_mono - started_mono
+        else:
             start_time = datetime.fromisoformat(info['started'])
             duration = (datetime.now() - start_time).total_seconds()
-            
-            # Check if still running
-            is_running = False
-            return_code = None
-            if proc:
-                proc.poll()
-                if proc.returncode is None:
-                    is_running = True
-                else:
-                    return_code = proc.returncode
-            
-            runner_info = {
-                'pid': info['pid'],
-                'status': 'running' if is_running else info.get('status', 'stopped'),
-                'duration': duration,
-                'duration_formatted': format_duration(duration),
-                'started': info['started'],
-                'prompt': info.get('prompt', 'N/A'),
-                'context_file': info.get('context_file'),
-                'report_file': info.get('report_data', {}).get('report_file'),
-                'model': info.get('model', 'N/A'),
-                'tool_counts': info.get('tool_counts', {}),
-                'tool_counts_formatted': format_tool_counts(info.get('tool_counts', {})),
-                'total_tokens': info.get('total_tokens', 0),
-                'input_tokens': info.get('total_input_tokens', 0),
-                'output_tokens': info.get('total_output_tokens', 0),
-                'cost_usd': info.get('cost_usd', 0),
-                'is_error': info.get('is_error', False),
-                'return_code': return_code,
-                'stream_log': info.get('stream_log'),
-                'report_log': info.get('report_log')
-            }
-            
-            # Add error info if available
-            if 'error' in info:
-                runner_info['error'] = info['error']
-            
-            runners[name] = runner_info
+        
+        # Check if still running
+        is_running = False
+        return_code = None
+        if proc:
+            proc.poll()
+            if proc.returncode is None:
+                is_running = True
+            else:
+                return_code = proc.returncode
+        
+        runner_info = {
+            'pid': info['pid'],
+            'status': 'running' if is_running else info.get('status', 'stopped'),
+            'duration': duration,
+            'duration_formatted': format_duration(duration),
+            'started': info['started'],
+            'prompt': info.get('prompt', 'N/A'),
+            'context_file': info.get('context_file'),
+            'report_file': info.get('report_data', {}).get('report_file'),
+            'model': info.get('model', 'N/A'),
+            'tool_counts': info.get('tool_counts', {}),
+            'tool_counts_formatted': format_tool_counts(info.get('tool_counts', {})),
+            'total_tokens': info.get('total_tokens', 0),
+            'input_tokens': info.get('total_input_tokens', 0),
+            'output_tokens': info.get('total_output_tokens', 0),
+            'cost_usd': info.get('cost_usd', 0),
+            'is_error': info.get('is_error', False),
+            'return_code': return_code,
+            'stream_log': info.get('stream_log'),
+            'report_log': info.get('report_log')
+        }
+        
+        # Add error info if available
+        if 'error' in info:
+            runner_info['error'] = info['error']
+        
+        runners[name] = runner_info
     
     if parsed_args.json:
         return {'success': True, 'runners': runners}
@@ -214,11 +236,11 @@ def command(manager, args: list) -> Dict[str, Any]:
         
         # Log files
         if info['stream_log']:
-            stream_name = info['stream_log'].split('/')[-1] if '/' in info['stream_log'] else info['stream_log']
+            stream_name = os.path.basename(info['stream_log'])
             output_lines.append(f"  Stream log: {stream_name}")
         
         if info['report_log']:
-            report_name = info['report_log'].split('/')[-1] if '/' in info['report_log'] else info['report_log']
+            report_name = os.path.basename(info['report_log'])
             output_lines.append(f"  Report log: {report_name}")
         
         output_lines.append("")
@@ -7,6 +7,9 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+# Runs of non-alphanumerics each become a single dash in project dir names
+_NON_ALNUM_RUN_RE = re.compile(r'[^a-zA-Z0-9]+')
+
 
 def get_parser():
     parser = argparse.ArgumentParser(
@@ -20,11 +23,8 @@ def get_parser():
 
 def sanitize_path_for_claude(path):
     """Convert a filesystem path to Claude's project directory format"""
-    # Replace all non-alphanumeric characters with dashes
-    sanitized = re.sub(r'[^a-zA-Z0-9]', '-', path)
-    # Collapse multiple consecutive dashes
-    sanitized = re.sub(r'-+', '-', sanitized)
-    return sanitized
+    # Replace each run of non-alphanumeric characters with a single dash
+    return _NON_ALNUM_RUN_RE.sub('-', path)
 
 
 def get_claude_project_dir(cwd):
@@ -34,15 +34,16 @@ def get_claude_project_dir(cwd):
 
 
 def get_streamfiles(cwd):
-    """Get all .jsonl files for the current directory"""
+    """Get (mtime, path) for all .jsonl files for the current directory"""
     claude_dir = get_claude_project_dir(cwd)
     
-    if not claude_dir.exists():
+    # Find all .jsonl files, taking mtimes from the directory scan
+    try:
+        with os.scandir(claude_dir) as entries:
+            return [(entry.stat().st_mtime, entry.path) for entry in entries
+                    if entry.name.endswith('.jsonl') and entry.is_file()]
+    except FileNotFoundError:
         return []
-    
-    # Find all .jsonl files
-    jsonl_files = list(claude_dir.glob('*.jsonl'))
-    return jsonl_files
 
 
 def format_timestamp(timestamp):
@@ -69,12 +70,12 @@ def command(manager, args):
     
     if parsed.all:
         # Show all files sorted by modification time
-        streamfiles.sort(key=lambda f: f.stat().st_mtime)
+        streamfiles.sort(key=lambda f: f[0])
         
         output = []
-        for f in streamfiles:
-            timestamp = format_timestamp(f.stat().st_mtime)
-            output.append(f"{timestamp}\t{f.absolute()}")
+        for mtime, path in streamfiles:
+            timestamp = format_timestamp(mtime)
+            output.append(f"{timestamp}\t{os.path.abspath(path)}")
         
         return {
             'success': True,
@@ -82,9 +83,9 @@ def command(manager, args):
         }
     else:
         # Show only the most recent file
-        latest = max(streamfiles, key=lambda f: f.stat().st_mtime)
+        latest = max(streamfiles, key=lambda f: f[0])
         
         return {
             'success': True,
-            'message': str(latest.absolute())
+            'message': os.path.abspath(latest[1])
         }
\ No newline at end of file
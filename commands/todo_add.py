@@ -2,11 +2,13 @@
 Add a todo item to a Claude session's todo list
 """
 import argparse
-import json
-import os
-from pathlib import Path
-from datetime import datetime
-import uuid
+
+from commands._todo_common import (
+    generate_todo_id,
+    get_todo_file,
+    load_todos,
+    save_todos,
+)
 
 
 def get_parser():
@@ -39,41 +41,12 @@ def get_parser():
     return parser
 
 
-def load_todos(todo_file):
-    """Load todos from file, return empty list if doesn't exist"""
-    if todo_file.exists():
-        try:
-            with open(todo_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
-    return []
-
-
-def save_todos(todo_file, todos):
-    """Save todos to file"""
-    # Ensure the directory exists
-    todo_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(todo_file, 'w') as f:
-        json.dump(todos, f, indent=2)
-
-
-def generate_todo_id():
-    """Generate a unique todo ID"""
-    # Use timestamp + short UUID for uniqueness and readability
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    short_uuid = str(uuid.uuid4())[:8]
-    return f"todo_{timestamp}_{short_uuid}"
-
-
 def command(manager, args):
     parser = get_parser()
     parsed = parser.parse_args(args)
     
     # Build todo file path
-    todo_dir = Path.home() / '.claude' / 'todos'
-    todo_file = todo_dir / f"{parsed.session}.json"
+    todo_file = get_todo_file(parsed.session)
     
     # Load existing todos
     todos = load_todos(todo_file)
@@ -86,22 +59,25 @@ def command(manager, args):
         'id': parsed.id or generate_todo_id()
     }
     
-    # Check for duplicate IDs
-    if any(todo['id'] == new_todo['id'] for todo in todos):
+    # Check for duplicate IDs; generated IDs are unique by construction
+    if parsed.id and parsed.id in {todo.get('id') for todo in todos}:
         return {
             'success': False,
             'error': f"Todo with ID '{new_todo['id']}' already exists"
         }
     
-    # Determine position
+    # Determine position, and how to describe it in the result
     position = None  # Default to append (end of list)
+    position_desc = ""
     
     if parsed.first:
         position = 0
+        position_desc = " at the beginning"
     elif parsed.last:
         position = -1  # Will be handled as append
     elif parsed.position is not None:
         position = parsed.position
+        position_desc = None  # Filled in once the actual index is known
     
     # Insert at the appropriate position
     if position is None or position == -1:
@@ -126,16 +102,13 @@ def command(manager, args):
             todos.insert(position, new_todo)
             actual_position = position
     
+    if position_desc is None:
+        position_desc = f" at position {actual_position}"
+    
     # Save
     try:
         save_todos(todo_file, todos)
         
-        position_desc = ""
-        if parsed.first:
-            position_desc = " at the beginning"
-        elif parsed.position is not None:
-            position_desc = f" at position {actual_position}"
-        
         return {
             'success': True,
             'message': f"Added todo '{new_todo['content']}' (ID: {new_todo['id']}) to session {parsed.session}{position_desc}\nTotal todos: {len(todos)}"
@@ -3,7 +3,30 @@ List todos for a Claude session
 """
 import argparse
 import json
-from pathlib import Path
+
+from commands._todo_common import get_todo_file, load_todos
+
+# Status emojis
+_STATUS_EMOJI = {
+    'pending': '⏳',
+    'in_progress': '🔄',
+    'completed': '✅'
+}
+
+# Priority emojis
+_PRIORITY_EMOJI = {
+    'low': '🔵',
+    'medium': '🟡',
+    'high': '🔴'
+}
+
+# Order the status sections are shown in, and their heading lines
+_STATUS_ORDER = ('in_progress', 'pending', 'completed')
+_STATUS_HEADINGS = {
+    status: f"\n{emoji} {status.upper().replace('_', ' ')}"
+    for status, emoji in _STATUS_EMOJI.items()
+}
+_SEP40 = "-" * 40
 
 
 def get_parser():
@@ -24,73 +47,50 @@ def get_parser():
     return parser
 
 
-def load_todos(todo_file):
-    """Load todos from file"""
-    if not todo_file.exists():
-        return []
-    
-    try:
-        with open(todo_file, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
-
-
 def format_todo_list(todos, filters):
     """Format todos for display"""
-    # Apply filters
-    filtered_todos = todos
-    if filters.get('status'):
-        filtered_todos = [t for t in filtered_todos if t.get('status') == filters['status']]
-    if filters.get('priority'):
-        filtered_todos = [t for t in filtered_todos if t.get('priority') == filters['priority']]
+    status_filter = filters.get('status')
+    priority_filter = filters.get('priority')
     
-    if not filtered_todos:
-        return "No todos found matching filters."
-    
-    # Group by status
+    # Apply filters and group by status in a single pass
     by_status = {
         'pending': [],
         'in_progress': [],
         'completed': []
     }
+    filtered_count = 0
     
-    for todo in filtered_todos:
-        status = todo.get('status', 'pending')
-        by_status[status].append(todo)
+    for todo in todos:
+        if status_filter and todo.get('status') != status_filter:
+            continue
+        if priority_filter and todo.get('priority') != priority_filter:
+            continue
+        by_status[todo.get('status', 'pending')].append(todo)
+        filtered_count += 1
+    
+    if not filtered_count:
+        return "No todos found matching filters."
     
     # Format output
     output = []
+    # Bind the per-todo lookups to locals for the inner loop
+    append = output.append
+    priority_emoji = _PRIORITY_EMOJI
     
-    # Status emojis
-    status_emoji = {
-        'pending': '⏳',
-        'in_progress': '🔄',
-        'completed': '✅'
-    }
-    
-    # Priority emojis
-    priority_emoji = {
-        'low': '🔵',
-        'medium': '🟡',
-        'high': '🔴'
-    }
-    
-    for status in ['in_progress', 'pending', 'completed']:
-        if by_status[status]:
-            output.append(f"\n{status_emoji[status]} {status.upper().replace('_', ' ')}")
-            output.append("-" * 40)
+    for status in _STATUS_ORDER:
+        status_todos = by_status[status]
+        if status_todos:
+            append(_STATUS_HEADINGS[status])
+            append(_SEP40)
             
-            for todo in by_status[status]:
-                priority = todo.get('priority', 'medium')
-                content = todo.get('content', 'No content')
-                todo_id = todo.get('id', 'No ID')
-                
-                output.append(f"{priority_emoji[priority]} [{todo_id}] {content}")
+            for todo in status_todos:
+                get = todo.get
+                append(f"{priority_emoji[get('priority', 'medium')]} "
+                       f"[{get('id', 'No ID')}] {get('content', 'No content')}")
     
     # Summary
-    output.append(f"\n📊 Total: {len(filtered_todos)} todos")
-    if len(filtered_todos) != len(todos):
+    output.append(f"\n📊 Total: {filtered_count} todos")
+    if filtered_count != len(todos):
         output.append(f"   (Filtered from {len(todos)} total)")
     
     return "\n".join(output)
@@ -101,7 +101,7 @@ def command(manager, args):
     parsed = parser.parse_args(args)
     
     # Build todo file path
-    todo_file = Path.home() / '.claude' / 'todos' / f"{parsed.session}.json"
+    todo_file = get_todo_file(parsed.session)
     
     # Load todos
     todos = load_todos(todo_file)
@@ -119,12 +119,17 @@ def command(manager, args):
     }
     
     if parsed.json:
-        # JSON output
-        filtered_todos = todos
-        if filters['status']:
-            filtered_todos = [t for t in filtered_todos if t.get('status') == filters['status']]
-        if filters['priority']:
-            filtered_todos = [t for t in filtered_todos if t.get('priority') == filters['priority']]
+        # JSON output, filtered in one pass (or not copied at all without filters)
+        status_filter = filters['status']
+        priority_filter = filters['priority']
+        if status_filter or priority_filter:
+            filtered_todos = [
+                t for t in todos
+                if (not status_filter or t.get('status') == status_filter)
+                and (not priority_filter or t.get('priority') == priority_filter)
+            ]
+        else:
+            filtered_todos = todos
         
         return {
             'success': True,
@@ -6,10 +6,38 @@ import json
 import os
 import re
 import hashlib
+import heapq
+import mmap
+import pickle
+import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+from commands._fastjson import dumps, loads
+from commands._json_cache import cached_for_file
+from commands._pool import parallel_map
+
+# Below this many session files, parse serially rather than use the worker pool
+PARALLEL_MIN_FILES = 3
+
+# Runs of non-alphanumerics each become a single dash in project dir names
+_NON_ALNUM_RUN_RE = re.compile(r'[^a-zA-Z0-9]+')
+
+# fromisoformat() understands a trailing 'Z' from Python 3.11 on
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+# Bumped whenever the shape of cached events changes, so older entries are
+# reparsed instead of misread
+EVENTS_CACHE_VERSION = 1
+
+# Most session files with events cached on disk; the least recently used
+# entries are deleted beyond this (checked after a process's first cache write)
+EVENTS_CACHE_MAX_FILES = 512
+
+# Whether this process has already pruned the events cache
+_events_cache_pruned = False
+
 
 def get_parser():
     parser = argparse.ArgumentParser(
@@ -35,11 +63,8 @@ def get_parser():
 
 def sanitize_path_for_claude(path):
     """Convert a filesystem path to Claude's project directory format"""
-    # Replace all non-alphanumeric characters with dashes
-    sanitized = re.sub(r'[^a-zA-Z0-9]', '-', path)
-    # Collapse multiple consecutive dashes (Claude seems to do some collapsing)
-    sanitized = re.sub(r'-+', '-', sanitized)
-    return sanitized
+    # Replace each run of non-alphanumeric characters with a single dash
+    return _NON_ALNUM_RUN_RE.sub('-', path)
 
 
 def get_claude_project_dir(cwd):
@@ -48,33 +73,43 @@ def get_claude_project_dir(cwd):
     return Path.home() / '.claude' / 'projects' / dir_component
 
 
+def list_stream_files(claude_dir):
+    """Return the paths (as strings) of all .jsonl files in a Claude project directory"""
+    with os.scandir(claude_dir) as entries:
+        return tuple(entry.path for entry in entries if entry.name.endswith('.jsonl'))
+
+
+def get_stream_files(claude_dir):
+    """List a project directory's .jsonl file paths, rescanning only when it changes"""
+    # Creating, removing or renaming a file updates the directory's mtime, so
+    # the listing from the last scan stays valid until then
+    try:
+        return cached_for_file(claude_dir, list_stream_files)
+    except FileNotFoundError:
+        return ()
+
+
 def find_latest_stream_file(cwd):
     """Find the most recently modified .jsonl file for the current directory"""
     claude_dir = get_claude_project_dir(cwd)
     
-    if not claude_dir.exists():
-        return None
-    
     # Find all .jsonl files and get the most recent
-    jsonl_files = list(claude_dir.glob('*.jsonl'))
+    jsonl_files = get_stream_files(claude_dir)
     if not jsonl_files:
         return None
     
-    return max(jsonl_files, key=lambda f: f.stat().st_mtime)
+    return Path(max(jsonl_files, key=lambda f: os.stat(f).st_mtime))
 
 
 def get_recent_stream_files(cwd, n=1):
     """Get the N most recently modified .jsonl files for the current directory"""
     claude_dir = get_claude_project_dir(cwd)
     
-    if not claude_dir.exists():
-        return []
-    
-    # Find all .jsonl files and sort by modification time (newest first)
-    jsonl_files = list(claude_dir.glob('*.jsonl'))
-    jsonl_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
+    # Pick the n newest .jsonl files (newest first) without sorting them all
+    jsonl_files = heapq.nlargest(n, get_stream_files(claude_dir),
+                                 key=lambda f: os.stat(f).st_mtime)
     
-    return jsonl_files[:n]
+    return [Path(f) for f in jsonl_files]
 
 
 def parse_line_for_todo_event(line_data):
@@ -211,76 +246,72 @@ def get_content_preview(message):
 
 def calculate_total_tokens(usage):
     """Calculate total tokens from usage dict"""
+    get = usage.get
     return (
-        usage.get('input_tokens', 0) +
-        usage.get('cache_creation_input_tokens', 0) +
-        usage.get('cache_read_input_tokens', 0)
+        get('input_tokens', 0) +
+        get('cache_creation_input_tokens', 0) +
+        get('cache_read_input_tokens', 0)
     )
 
 
-def parse_session_todos(stream_file):
-    """Parse all todo events from a single session file"""
-    todo_events = []
-    
-    try:
-        with open(stream_file, 'r', encoding='utf-8', errors='replace') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                try:
-                    data = json.loads(line)
-                    timestamp = data.get('timestamp')
-                    if not timestamp:
-                        continue
-                    
-                    todo_event = parse_line_for_todo_event(data)
-                    if todo_event:
-                        todo_events.append({
-                            'timestamp': timestamp,
-                            'line': line_num,
-                            'todos': todo_event['todos'],
-                            'total_tokens': todo_event['total_tokens'],
-                            'usage': todo_event['usage']
-                        })
-                except json.JSONDecodeError as e:
-                    # Log the problematic line for debugging
-                    print(f"[tokens] JSON decode error at line {line_num}: {e}")
-                    print(f"[tokens] Problematic line preview: {line[:100]}...")
-                    continue
-                except Exception as e:
-                    # Skip any other parsing errors
-                    print(f"[tokens] Unexpected error at line {line_num}: {type(e).__name__}: {e}")
-                    continue
-    except (FileNotFoundError, IOError) as e:
-        # File access errors - return empty list
-        print(f"[tokens] File access error: {e}")
-        pass
-    except Exception as e:
-        # Any other unexpected errors
-        print(f"[tokens] Warning: Error parsing {stream_file}: {e}")
-    
-    return sorted(todo_events, key=lambda x: x['timestamp'])
-
+def parse_jsonl_line(line):
+    """Parse one JSONL line given as bytes
 
-def parse_session_tasks(stream_file):
-    """Parse all task events from a single session file"""
+    Invalid UTF-8 is replaced rather than rejected, as reading the file in
+    text mode with errors='replace' would.
+    """
+    try:
+        return loads(line)
+    except ValueError:
+        try:
+            line.decode('utf-8')
+        except UnicodeDecodeError:
+            return loads(line.decode('utf-8', errors='replace'))
+        raise
+
+
+def read_session_events(stream_file, todos=True, tasks=True):
+    """Parse todo and/or task events from a single session file in one pass
+
+    Returns (todo_events, task_events), each sorted by timestamp; a kind that
+    wasn't asked for comes back as an empty list. Raises OSError if the file
+    can't be read.
+    """
+    todo_events = []
     task_events = []
     
-    try:
-        with open(stream_file, 'r', encoding='utf-8', errors='replace') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
+    with open(stream_file, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            # mmap() refuses empty files, and there's nothing to parse
+            return todo_events, task_events
+        mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    
+    with mapping:
+        # The file is scanned front to back once, so let the kernel read
+        # ahead aggressively instead of faulting pages in a few at a time
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+        for line_num, line in enumerate(iter(mapping.readline, b''), 1):
+            # Lines are passed on unstripped: the decoder skips the
+            # trailing newline itself
+            if line.isspace():
+                continue
+            
+            # Only decode lines that could hold a wanted event: todo
+            # events need a TodoWrite call, task events a uuid
+            want_todo = todos and b'"TodoWrite"' in line
+            want_task = tasks and b'"uuid"' in line
+            if not (want_todo or want_task):
+                continue
+            
+            try:
+                data = parse_jsonl_line(line)
+                timestamp = data.get('timestamp')
+                if not timestamp:
                     continue
                 
-                try:
-                    data = json.loads(line)
-                    timestamp = data.get('timestamp')
-                    if not timestamp:
-                        continue
-                    
+                if want_task:
                     task_event = parse_line_for_task_event(data)
                     if task_event:
                         task_events.append({
@@ -294,24 +325,175 @@ def parse_session_tasks(stream_file):
                             'usage': task_event['usage'],
                             'content_preview': task_event['content_preview']
                         })
-                except json.JSONDecodeError as e:
-                    # Log the problematic line for debugging
-                    print(f"[tokens] JSON decode error at line {line_num}: {e}")
-                    print(f"[tokens] Problematic line preview: {line[:100]}...")
-                    continue
-                except Exception as e:
-                    # Skip any other parsing errors
-                    print(f"[tokens] Unexpected error at line {line_num}: {type(e).__name__}: {e}")
-                    continue
-    except (FileNotFoundError, IOError) as e:
-        # File access errors - return empty list
-        print(f"[tokens] File access error: {e}")
+                
+                if want_todo:
+                    todo_event = parse_line_for_todo_event(data)
+                    if todo_event:
+                        todo_events.append({
+                            'timestamp': timestamp,
+                            'line': line_num,
+                            'todos': todo_event['todos'],
+                            'total_tokens': todo_event['total_tokens'],
+                            'usage': todo_event['usage']
+                        })
+            except json.JSONDecodeError as e:
+                # Log the problematic line for debugging
+                print(f"[tokens] JSON decode error at line {line_num}: {e}")
+                print(f"[tokens] Problematic line preview: {line.strip()[:100].decode('utf-8', errors='replace')}...")
+                continue
+            except Exception as e:
+                # Skip any other parsing errors
+                print(f"[tokens] Unexpected error at line {line_num}: {type(e).__name__}: {e}")
+                continue
+    
+    todo_events.sort(key=lambda x: x['timestamp'])
+    task_events.sort(key=lambda x: x['timestamp'])
+    return todo_events, task_events
+
+
+def report_read_error(stream_file, error):
+    """Print why a session file couldn't be parsed"""
+    if isinstance(error, OSError):
+        print(f"[tokens] File access error: {error}")
+    else:
+        print(f"[tokens] Warning: Error parsing {stream_file}: {error}")
+
+
+def parse_session_events(stream_file, todos=True, tasks=True):
+    """read_session_events(), reporting a failed read and returning empty lists"""
+    try:
+        return read_session_events(stream_file, todos, tasks)
+    except Exception as e:
+        report_read_error(stream_file, e)
+        return [], []
+
+
+def get_events_cache_file(stream_file):
+    """Return where parsed events for a session file are cached"""
+    name = hashlib.sha1(os.fsencode(os.path.abspath(stream_file))).hexdigest()
+    return Path.home() / '.cache' / 'claudecontroller' / 'tokens' / f"{name}.pickle"
+
+
+def prune_events_cache(cache_dir):
+    """Delete the least recently used cache entries beyond EVENTS_CACHE_MAX_FILES"""
+    try:
+        with os.scandir(cache_dir) as it:
+            entries = [(entry.stat().st_mtime_ns, entry.path)
+                       for entry in it if entry.name.endswith('.pickle')]
+    except OSError:
+        return
+    
+    excess = len(entries) - EVENTS_CACHE_MAX_FILES
+    if excess <= 0:
+        return
+    for _, path in heapq.nsmallest(excess, entries):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def load_session_events(stream_file, todos=True, tasks=True):
+    """parse_session_events(), reusing the events cached on disk by an earlier run
+
+    The cache entry is only used while it has the current format, the file's
+    mtime and size are unchanged and it holds every kind of event asked for.
+    """
+    global _events_cache_pruned
+    
+    try:
+        st = os.stat(stream_file)
+    except OSError:
+        # Let the parser report it
+        return parse_session_events(stream_file, todos, tasks)
+    
+    cache_file = get_events_cache_file(stream_file)
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if (cached['version'] == EVENTS_CACHE_VERSION
+                and cached['mtime_ns'] == st.st_mtime_ns and cached['size'] == st.st_size
+                and (cached['todos'] or not todos) and (cached['tasks'] or not tasks)):
+            # Mark the entry as recently used so pruning keeps it
+            os.utime(cache_file)
+            return (cached['todo_events'] if todos else [],
+                    cached['task_events'] if tasks else [])
+    except Exception:
+        # Missing, stale-format or unreadable cache: parse the file instead
         pass
+    
+    try:
+        todo_events, task_events = read_session_events(stream_file, todos, tasks)
     except Exception as e:
-        # Any other unexpected errors
-        print(f"[tokens] Warning: Error parsing {stream_file}: {e}")
+        # Nothing is cached for a failed read, so the next run tries again
+        report_read_error(stream_file, e)
+        return [], []
+    
+    # Stamped with the stat taken before parsing, so a file that grew while
+    # being read just misses next time. The cache is best-effort: failing to
+    # write it is silent.
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        data = pickle.dumps({
+            'version': EVENTS_CACHE_VERSION,
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'todos': todos,
+            'tasks': tasks,
+            'todo_events': todo_events,
+            'task_events': task_events
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    else:
+        if not _events_cache_pruned:
+            _events_cache_pruned = True
+            prune_events_cache(cache_file.parent)
     
-    return sorted(task_events, key=lambda x: x['timestamp'])
+    return todo_events, task_events
+
+
+def parse_sessions(stream_files, todos=True, tasks=True):
+    """Run load_session_events() over each file, across worker processes when there are several"""
+    if len(stream_files) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) >= 2:
+        count = len(stream_files)
+        results = parallel_map(load_session_events, stream_files, [todos] * count, [tasks] * count)
+        if results is not None:
+            return results
+    return [load_session_events(stream_file, todos, tasks) for stream_file in stream_files]
+
+
+def parse_session_todos(stream_file):
+    """Parse all todo events from a single session file"""
+    return parse_session_events(stream_file, tasks=False)[0]
+
+
+def parse_session_tasks(stream_file):
+    """Parse all task events from a single session file"""
+    return parse_session_events(stream_file, todos=False)[1]
+
+
+def parse_timestamp(timestamp):
+    """Parse an ISO 8601 event timestamp, which may end in 'Z'"""
+    return datetime.fromisoformat(timestamp if _FROMISOFORMAT_ACCEPTS_Z
+                                  else timestamp.replace('Z', '+00:00'))
+
+
+class TodoTrack:
+    """How one todo moved through in_progress and completed across events"""
+    __slots__ = ('id', 'status', 'in_progress', 'completed')
+    
+    def __init__(self, todo_id, status):
+        self.id = todo_id
+        self.status = status
+        # (timestamp, cumulative tokens) of the first in_progress event, and
+        # of the first completed event after it; None until seen
+        self.in_progress = None
+        self.completed = None
 
 
 def track_todo_lifecycle(todo_events):
@@ -320,7 +502,9 @@ def track_todo_lifecycle(todo_events):
     todo_tracking = {}
     
     for event in todo_events:
-        event_time = datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00'))
+        # Parsed once per event, and shared by all of its todos
+        event_time = parse_timestamp(event['timestamp'])
+        event_tokens = event['total_tokens']
         
         for todo in event['todos']:
             todo_id = todo.get('id')
@@ -328,42 +512,23 @@ def track_todo_lifecycle(todo_events):
             todo_status = todo.get('status', 'unknown')
             
             # Use content as the key
-            if todo_content not in todo_tracking:
-                todo_tracking[todo_content] = {
-                    'id': todo_id,  # Keep ID for reference
-                    'in_progress_event': None,
-                    'completed_event': None,
-                    'status': todo_status,
-                    'all_events': []  # Track all events for debugging
-                }
-            
-            # Track all events for this todo
-            todo_tracking[todo_content]['all_events'].append({
-                'timestamp': event_time,
-                'status': todo_status,
-                'tokens': event['total_tokens']
-            })
+            tracking = todo_tracking.get(todo_content)
+            if tracking is None:
+                tracking = todo_tracking[todo_content] = TodoTrack(todo_id, todo_status)
             
             # Track when todo goes in_progress
-            if (todo_status == 'in_progress' and 
-                todo_tracking[todo_content]['in_progress_event'] is None):
-                todo_tracking[todo_content]['in_progress_event'] = {
-                    'timestamp': event_time,
-                    'tokens': event['total_tokens']
-                }
+            if todo_status == 'in_progress' and tracking.in_progress is None:
+                tracking.in_progress = (event_time, event_tokens)
             
             # Track when todo is completed AFTER being in_progress
             if (todo_status == 'completed' and 
-                todo_tracking[todo_content]['in_progress_event'] is not None and
-                todo_tracking[todo_content]['completed_event'] is None):
-                todo_tracking[todo_content]['completed_event'] = {
-                    'timestamp': event_time,
-                    'tokens': event['total_tokens']
-                }
+                tracking.in_progress is not None and
+                tracking.completed is None):
+                tracking.completed = (event_time, event_tokens)
             
             # Update latest status and ID
-            todo_tracking[todo_content]['status'] = todo_status
-            todo_tracking[todo_content]['id'] = todo_id  # Update ID in case it changed
+            tracking.status = todo_status
+            tracking.id = todo_id  # Update ID in case it changed
     
     return todo_tracking
 
@@ -373,23 +538,25 @@ def calculate_todo_metrics(todo_tracking, session_id):
     todo_metrics = {}
     
     for todo_content, tracking in todo_tracking.items():
-        in_progress = tracking['in_progress_event']
-        completed = tracking['completed_event']
-        todo_id = tracking['id']
+        in_progress = tracking.in_progress
+        completed = tracking.completed
+        todo_id = tracking.id
         
         # Generate unique ID
         unique_id = generate_unique_id(todo_content, session_id, item_type="todo")
         
         if in_progress and completed:
             # Calculate from in_progress to completed
-            token_delta = completed['tokens'] - in_progress['tokens']
+            started_at, start_tokens = in_progress
+            completed_at, end_tokens = completed
+            token_delta = end_tokens - start_tokens
             if token_delta >= 0:  # Skip negative deltas
-                duration = completed['timestamp'] - in_progress['timestamp']
+                duration = completed_at - started_at
                 todo_metrics[todo_content] = {
                     'id': todo_id,
                     'unique_id': unique_id,
-                    'started_at': in_progress['timestamp'],
-                    'completed_at': completed['timestamp'],
+                    'started_at': started_at,
+                    'completed_at': completed_at,
                     'status': 'completed',
                     'total_tokens': token_delta,
                     'duration': duration
@@ -399,7 +566,7 @@ def calculate_todo_metrics(todo_tracking, session_id):
             todo_metrics[todo_content] = {
                 'id': todo_id,
                 'unique_id': unique_id,
-                'started_at': in_progress['timestamp'],
+                'started_at': in_progress[0],
                 'completed_at': None,
                 'status': 'in_progress',
                 'total_tokens': None,  # Unknown until completed
@@ -425,9 +592,9 @@ def analyze_sessions_todos(stream_files):
     """Analyze todo token usage grouped by session"""
     sessions_analysis = {}
     
-    for stream_file in stream_files:
+    parsed = parse_sessions(stream_files, tasks=False)
+    for stream_file, (todo_events, _) in zip(stream_files, parsed):
         session_id = stream_file.stem
-        todo_events = parse_session_todos(stream_file)
         
         if todo_events:
             todo_tracking = track_todo_lifecycle(todo_events)
@@ -448,10 +615,11 @@ def build_task_chains(task_events, session_id=None):
     task_chains = {}
     all_tasks = {}
     
-    # First pass: index all tasks by UUID
+    # First pass: index all tasks by UUID, then by parent
     for event in task_events:
         uuid = event['uuid']
         all_tasks[uuid] = event
+    children = index_task_children(all_tasks)
     
     # Second pass: identify sidechain roots and build chains
     for event in task_events:
@@ -480,7 +648,7 @@ def build_task_chains(task_events, session_id=None):
             }
             
             # Collect all tasks in this chain
-            chain_tasks = collect_chain_tasks(chain_id, all_tasks)
+            chain_tasks = collect_chain_tasks(chain_id, all_tasks, children)
             task_chains[chain_id]['tasks'] = chain_tasks
             
             # Calculate metrics with CORRECTED token calculation
@@ -509,7 +677,7 @@ def build_task_chains(task_events, session_id=None):
                 
                 task_chains[chain_id]['task_count'] = len(chain_tasks)
                 
-                timestamps = [datetime.fromisoformat(t['timestamp'].replace('Z', '+00:00')) 
+                timestamps = [parse_timestamp(t['timestamp'])
                              for t in chain_tasks if t['timestamp']]
                 if timestamps:
                     task_chains[chain_id]['start_time'] = min(timestamps)
@@ -518,21 +686,34 @@ def build_task_chains(task_events, session_id=None):
     return task_chains
 
 
-def collect_chain_tasks(chain_root_uuid, all_tasks):
-    """Recursively collect all tasks in a chain"""
-    chain_tasks = []
-    
-    def collect_descendants(parent_uuid):
-        for uuid, task in all_tasks.items():
-            if task['parent_uuid'] == parent_uuid:
-                chain_tasks.append(task)
-                # Recursively collect children
-                collect_descendants(uuid)
+def index_task_children(all_tasks):
+    """Map each parent UUID to its (uuid, task) children, in all_tasks order"""
+    children = defaultdict(list)
+    for uuid, task in all_tasks.items():
+        children[task['parent_uuid']].append((uuid, task))
+    return children
+
+
+def collect_chain_tasks(chain_root_uuid, all_tasks, children=None):
+    """Collect all tasks in a chain by walking down from its root"""
+    if chain_root_uuid not in all_tasks:
+        return []
+    if children is None:
+        children = index_task_children(all_tasks)
     
-    # Start from the chain root
-    if chain_root_uuid in all_tasks:
-        chain_tasks.append(all_tasks[chain_root_uuid])
-        collect_descendants(chain_root_uuid)
+    # Depth-first, parents before children, with an explicit stack; children
+    # are pushed in reverse so they come off it in their original order
+    chain_tasks = []
+    seen = set()
+    stack = [(chain_root_uuid, all_tasks[chain_root_uuid])]
+    while stack:
+        uuid, task = stack.pop()
+        if uuid in seen:
+            # Only possible with a cycle in the parent links
+            continue
+        seen.add(uuid)
+        chain_tasks.append(task)
+        stack.extend(reversed(children.get(uuid, ())))
     
     return sorted(chain_tasks, key=lambda x: x['timestamp'])
 
@@ -541,9 +722,9 @@ def analyze_sessions_tasks(stream_files):
     """Analyze task token usage grouped by session"""
     sessions_analysis = {}
     
-    for stream_file in stream_files:
+    parsed = parse_sessions(stream_files, todos=False)
+    for stream_file, (_, task_events) in zip(stream_files, parsed):
         session_id = stream_file.stem
-        task_events = parse_session_tasks(stream_file)
         
         if task_events:
             task_chains = build_task_chains(task_events, session_id)
@@ -561,13 +742,11 @@ def analyze_sessions_unified(stream_files):
     """Analyze both task and todo token usage grouped by session"""
     sessions_analysis = {}
     
-    for stream_file in stream_files:
+    # Parse both tasks and todos in a single pass over each file
+    parsed = parse_sessions(stream_files)
+    for stream_file, (todo_events, task_events) in zip(stream_files, parsed):
         session_id = stream_file.stem
         
-        # Parse both tasks and todos
-        task_events = parse_session_tasks(stream_file)
-        todo_events = parse_session_todos(stream_file)
-        
         unified_data = {
             'file': str(stream_file),
             'task_chains': {},
@@ -592,6 +771,14 @@ def analyze_sessions_unified(stream_files):
     return sessions_analysis
 
 
+def sort_chains_by_start(task_chains):
+    """Return task_chains' (chain_id, chain_data) items ordered by start time"""
+    # Chains without a start time sort first; the placeholder is built once
+    # here rather than in the sort key for every chain
+    no_start = datetime.min.replace(tzinfo=datetime.now().astimezone().tzinfo)
+    return sorted(task_chains.items(), key=lambda x: x[1]['start_time'] or no_start)
+
+
 def format_session_todos(session_id, session_data):
     """Format todo output for a single session"""
     output = []
@@ -667,10 +854,7 @@ def format_session_tasks(session_id, session_data):
         return output
     
     # Sort chains by start time
-    sorted_chains = sorted(
-        task_chains.items(),
-        key=lambda x: x[1]['start_time'] or datetime.min.replace(tzinfo=datetime.now().astimezone().tzinfo)
-    )
+    sorted_chains = sort_chains_by_start(task_chains)
     
     for chain_id, chain_data in sorted_chains:
         root_task = chain_data['root_task']
@@ -729,14 +913,9 @@ def format_todos_brief(sessions_analysis):
     
     output = []
     
-    # Sort sessions by file modification time (newest first)
-    sorted_sessions = sorted(
-        sessions_analysis.items(),
-        key=lambda x: Path(x[1]['file']).stat().st_mtime,
-        reverse=True
-    )
-    
-    for session_id, session_data in sorted_sessions:
+    # Sessions are already newest first: the analyze_* functions keep the
+    # order of get_recent_stream_files(), which sorted them by mtime
+    for session_id, session_data in sessions_analysis.items():
         output.append(f"# {session_id}")
         
         todos = session_data['todos']
@@ -802,19 +981,14 @@ def format_todos_output(sessions_analysis, json_output=False, brief=False):
                     'total_tokens': metrics['total_tokens'],
                     'duration_seconds': metrics['duration'].total_seconds() if metrics['duration'] else None
                 }
-        return json.dumps(serializable, indent=2)
+        return dumps(serializable, indent=True).decode('utf-8')
     
     # Human-readable format
     output = ["📋 Todo Token Analysis"]
     
-    # Sort sessions by file modification time (newest first)
-    sorted_sessions = sorted(
-        sessions_analysis.items(),
-        key=lambda x: Path(x[1]['file']).stat().st_mtime,
-        reverse=True
-    )
-    
-    for session_id, session_data in sorted_sessions:
+    # Sessions are already newest first: the analyze_* functions keep the
+    # order of get_recent_stream_files(), which sorted them by mtime
+    for session_id, session_data in sessions_analysis.items():
         output.extend(format_session_todos(session_id, session_data))
     
     return "\n".join(output)
@@ -839,10 +1013,7 @@ def format_session_unified(session_id, session_data):
         output.append("-" * 20)
         
         # Sort chains by start time
-        sorted_chains = sorted(
-            task_chains.items(),
-            key=lambda x: x[1]['start_time'] or datetime.min.replace(tzinfo=datetime.now().astimezone().tzinfo)
-        )
+        sorted_chains = sort_chains_by_start(task_chains)
         
         for chain_id, chain_data in sorted_chains:
             root_task = chain_data['root_task']
@@ -931,19 +1102,14 @@ def format_tasks_output(sessions_analysis, json_output=False):
                         for task in chain_data['tasks']
                     ]
                 }
-        return json.dumps(serializable, indent=2)
+        return dumps(serializable, indent=True).decode('utf-8')
     
     # Human-readable format
     output = ["🔗 Task Chain Token Analysis"]
     
-    # Sort sessions by file modification time (newest first)
-    sorted_sessions = sorted(
-        sessions_analysis.items(),
-        key=lambda x: Path(x[1]['file']).stat().st_mtime,
-        reverse=True
-    )
-    
-    for session_id, session_data in sorted_sessions:
+    # Sessions are already newest first: the analyze_* functions keep the
+    # order of get_recent_stream_files(), which sorted them by mtime
+    for session_id, session_data in sessions_analysis.items():
         output.extend(format_session_tasks(session_id, session_data))
     
     return "\n".join(output)
@@ -989,51 +1155,66 @@ def format_unified_output(sessions_analysis, json_output=False):
                     'duration_seconds': metrics['duration'].total_seconds() if metrics['duration'] else None
                 }
         
-        return json.dumps(serializable, indent=2)
+        return dumps(serializable, indent=True).decode('utf-8')
     
     # Human-readable format
     output = ["🔗📋 Unified Task & Todo Token Analysis"]
     
-    # Sort sessions by file modification time (newest first)
-    sorted_sessions = sorted(
-        sessions_analysis.items(),
-        key=lambda x: Path(x[1]['file']).stat().st_mtime,
-        reverse=True
-    )
-    
-    for session_id, session_data in sorted_sessions:
+    # Sessions are already newest first: the analyze_* functions keep the
+    # order of get_recent_stream_files(), which sorted them by mtime
+    for session_id, session_data in sessions_analysis.items():
         output.extend(format_session_unified(session_id, session_data))
     
     return "\n".join(output)
 
 
+def iter_lines_reversed(stream_file):
+    """Yield a file's lines as bytes, last to first, from a read-only mapping"""
+    fd = os.open(stream_file, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        size = os.fstat(fd).st_size
+        if not size:
+            return
+        mapping = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+    
+    # Only the pages holding the lines actually consumed get faulted in
+    with mapping:
+        end = size
+        while end >= 0:
+            start = mapping.rfind(b'\n', 0, end) + 1
+            yield mapping[start:end]
+            end = start - 1
+
+
+def find_last_usage(stream_file):
+    """Return the usage of the last message in a stream file that has one"""
+    # Work backwards from the end so only the tail of the file is read
+    for line in iter_lines_reversed(stream_file):
+        # A line without a "usage" key can't have message usage, so skip
+        # decoding it; tool results in particular can be very large
+        if b'"usage"' not in line:
+            continue
+            
+        try:
+            data = loads(line)
+            # Look for usage data in the message
+            if 'message' in data and 'usage' in data.get('message', {}):
+                usage = data['message']['usage']
+                if usage:  # Make sure it's not empty
+                    return usage
+        except ValueError:
+            continue
+    
+    return None
+
+
 def get_token_usage(stream_file):
     """Extract token usage from the last line of a Claude stream file"""
     try:
-        with open(stream_file, 'r') as f:
-            # Read the last line
-            lines = f.readlines()
-            if not lines:
-                return None
-            
-            # Try to find the last message with usage info
-            # Start from the end and work backwards
-            for i in range(len(lines) - 1, -1, -1):
-                line = lines[i].strip()
-                if not line:
-                    continue
-                    
-                try:
-                    data = json.loads(line)
-                    # Look for usage data in the message
-                    if 'message' in data and 'usage' in data.get('message', {}):
-                        usage = data['message']['usage']
-                        if usage:  # Make sure it's not empty
-                            return usage
-                except json.JSONDecodeError:
-                    continue
-            
-            return None
+        # Reuse the previous answer while the stream file hasn't changed
+        return cached_for_file(stream_file, find_last_usage)
     except (FileNotFoundError, IOError) as e:
         return None
 
@@ -1081,7 +1262,7 @@ def format_token_stats(stats, json_output=False, brief=False):
         return "No token usage data found for current conversation."
     
     if json_output:
-        return json.dumps(stats, indent=2)
+        return dumps(stats, indent=True).decode('utf-8')
     
     if brief:
         # Brief format: "800 / 165,000 (0.5%)"
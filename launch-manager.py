@@ -8,6 +8,7 @@ import threading
 import json
 import subprocess
 import os
+import select
 import signal
 import time
 import sys
@@ -20,14 +21,35 @@ from typing import Dict, Any, Callable, Optional, Tuple
 from datetime import datetime
 import psutil
 
+# How often the SIGCHLD reaper checks watched pids while the handler is not
+# installed yet (it can only be installed from the main thread)
+REAP_POLL_INTERVAL = 0.5
+
 class ProcessManager:
     def __init__(self):
         self.processes: Dict[str, subprocess.Popen] = {}
         self.process_info: Dict[str, Dict[str, Any]] = {}
+        # Claude runners' process_info entries, so runner-status needn't scan all
+        self.claude_runners: Dict[str, Dict[str, Any]] = {}
         self.commands: Dict[str, Callable] = {}
         self.command_help: Dict[str, str] = {}
         self.command_modules: Dict[str, Any] = {}  # Store modules for help
         
+        # Exit notification: pidfd -> (name, process, on_exit), all watched by
+        # one epoll. Names of watched processes get 'ended'/'returncode' pushed
+        # into process_info, so callers don't need to poll them.
+        self.exit_watched = set()
+        self._pidfds: Dict[int, Tuple[str, Any, Optional[Callable]]] = {}
+        self._pidfd_lock = threading.Lock()
+        self._epoll = None
+        # Fallback when pidfds aren't available: pid -> name. The SIGCHLD
+        # handler only wakes a reaper thread through a self-pipe; the thread
+        # does the waitid()/poll() work. Set up by the first watch_pid().
+        self.pid2name: Dict[int, str] = {}
+        self._pid2name_lock = threading.Lock()
+        self._reaper_pipe: Optional[Tuple[int, int]] = None
+        self._sigchld_installed = False
+        
         # Load configuration
         self.controller_dir = Path(__file__).resolve().parent
         self.config = self._load_config()
@@ -154,13 +176,20 @@ class ProcessManager:
                 continue
                 
             try:
-                # Load the module
+                # Load the module under the commands package and register it,
+                # so its functions can be pickled (e.g. for process pools)
+                module_name = f"commands.{cmd_file.stem}"
                 spec = importlib.util.spec_from_file_location(
-                    cmd_file.stem, cmd_file
+                    module_name, cmd_file
                 )
                 if spec and spec.loader:
                     module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
+                    sys.modules[module_name] = module
+                    try:
+                        spec.loader.exec_module(module)
+                    except:
+                        del sys.modules[module_name]
+                        raise
                     
                     # Look for command function
                     if hasattr(module, 'command'):
@@ -291,6 +320,154 @@ class ProcessManager:
         else:
             return {'success': False, 'error': f'Unknown command: {cmd_name}'}
     
+    def register_pidfd(self, name: str, pidfd: int, on_exit: Optional[Callable] = None):
+        """Watch a process's pidfd and record its exit as soon as it happens
+        
+        on_exit, if given, is called with the process's info dict after the
+        exit is recorded. It runs on the shared watcher thread, so it must not
+        block for long.
+        """
+        with self._pidfd_lock:
+            if self._epoll is None:
+                self._epoll = select.epoll()
+                watcher = threading.Thread(target=self._watch_pidfds, daemon=True)
+                watcher.start()
+            self._pidfds[pidfd] = (name, self.processes.get(name), on_exit)
+            self.exit_watched.add(name)
+            self._epoll.register(pidfd, select.EPOLLIN)
+    
+    def _watch_pidfds(self):
+        """Block on the shared epoll and mark processes ended as their pidfds fire"""
+        while True:
+            for pidfd, _ in self._epoll.poll():
+                with self._pidfd_lock:
+                    name, proc, on_exit = self._pidfds.pop(pidfd, (None, None, None))
+                    self._epoll.unregister(pidfd)
+                os.close(pidfd)
+                
+                info = self.process_info.get(name)
+                if info is None:
+                    continue
+                info['ended'] = datetime.now().isoformat()
+                info['ended_monotonic'] = time.monotonic()
+                
+                # The child has already exited, so this wait() only reaps it
+                if proc:
+                    info['returncode'] = proc.wait()
+                
+                if on_exit is not None:
+                    try:
+                        on_exit(info)
+                    except Exception as e:
+                        self.logger.error(f"Exit handler for {name} failed: {e}")
+    
+    def watch_pid(self, name: str, pid: int) -> bool:
+        """Record a process's exit via SIGCHLD, for kernels without pidfd_open
+        
+        Returns False, leaving the process for callers to poll, on platforms
+        without waitid() or if the reaper thread can't be set up.
+        """
+        if not hasattr(os, 'waitid'):
+            return False
+        
+        with self._pid2name_lock:
+            if self._reaper_pipe is None:
+                try:
+                    # os.pipe() fds are already close-on-exec
+                    read_fd, write_fd = os.pipe()
+                    os.set_blocking(read_fd, False)
+                    os.set_blocking(write_fd, False)
+                except OSError as e:
+                    self.logger.error(f"Could not set up exit watching for {name}: {e}")
+                    return False
+                self._reaper_pipe = (read_fd, write_fd)
+                reaper = threading.Thread(target=self._reap_watched_pids, daemon=True)
+                reaper.start()
+            self.pid2name[pid] = name
+            self.exit_watched.add(name)
+        
+        # signal.signal() only works on the main thread; from a client thread
+        # the accept loop installs the handler on its next pass instead
+        if threading.current_thread() is threading.main_thread():
+            self.install_sigchld_handler()
+        
+        # Catch a child that exited before it was added to the map
+        self._wake_reaper()
+        return True
+    
+    def install_sigchld_handler(self):
+        """Install the SIGCHLD handler once watch_pid() has been used"""
+        if self._reaper_pipe is None or self._sigchld_installed:
+            return
+        signal.signal(signal.SIGCHLD, self._on_sigchld)
+        self._sigchld_installed = True
+        # Children may have exited while there was no handler
+        self._wake_reaper()
+    
+    def _on_sigchld(self, signum, frame):
+        """SIGCHLD handler: just wake the reaper thread"""
+        self._wake_reaper()
+    
+    def _wake_reaper(self):
+        try:
+            os.write(self._reaper_pipe[1], b'\0')
+        except BlockingIOError:
+            # Pipe full: a wakeup is already pending
+            pass
+    
+    def _reap_watched_pids(self):
+        """Check watched pids whenever SIGCHLD (or watch_pid) wakes us"""
+        wakeup_fd = self._reaper_pipe[0]
+        while True:
+            # Until the handler is installed no signal will come, so poll
+            timeout = None if self._sigchld_installed else REAP_POLL_INTERVAL
+            select.select([wakeup_fd], [], [], timeout)
+            try:
+                os.read(wakeup_fd, 4096)
+            except BlockingIOError:
+                pass
+            try:
+                self.check_exited_children()
+            except Exception as e:
+                self.logger.error(f"Checking exited children failed: {e}")
+    
+    def check_exited_children(self):
+        """Mark exited processes from pid2name as ended (runs on the reaper thread)"""
+        with self._pid2name_lock:
+            watched = list(self.pid2name.items())
+        for pid, name in watched:
+            # WNOWAIT only peeks, leaving the child for its owner to reap
+            try:
+                result = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            except ChildProcessError:
+                result = None
+                proc = self.processes.get(name)
+                if proc is not None and proc.returncode is None:
+                    continue
+            else:
+                if result is None:
+                    continue
+            
+            with self._pid2name_lock:
+                self.pid2name.pop(pid, None)
+            info = self.process_info.get(name)
+            if info is None:
+                continue
+            info['ended'] = datetime.now().isoformat()
+            info['ended_monotonic'] = time.monotonic()
+            
+            proc = self.processes.get(name)
+            if result is not None:
+                # The status waitid() peeked at is the real one; poll() just
+                # reaps the zombie (unless another thread is waiting on it)
+                returncode = result.si_status if result.si_code == os.CLD_EXITED else -result.si_status
+                if proc is not None:
+                    proc.poll()
+            else:
+                # Already reaped by its owner, which recorded the status
+                returncode = proc.returncode if proc is not None else None
+            info['returncode'] = returncode
+    
     def stop_process(self, name: str):
         """Stop a managed process"""
         if name in self.processes:
@@ -339,6 +516,9 @@ class ProcessManager:
         print(f"Launch manager listening on {self.socket_path}")
         
         while self.running:
+            # Deferred from watch_pid() calls made on client threads
+            if self._reaper_pipe is not None and not self._sigchld_installed:
+                self.install_sigchld_handler()
             try:
                 server_socket.settimeout(self.socket_timeout)
                 client, _ = server_socket.accept()
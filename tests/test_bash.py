@@ -0,0 +1,118 @@
+"""
+Unit tests for the posix_spawn helpers in commands/bash.py
+
+Run from the repository root with: python -m unittest discover tests
+"""
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commands import bash
+
+
+def spawn_quiet(command):
+    with open(os.devnull, 'wb') as devnull:
+        return bash.spawn_shell(command, devnull.fileno())
+
+
+class SpawnShellTest(unittest.TestCase):
+    def test_output_goes_to_fd(self):
+        with tempfile.TemporaryFile() as out:
+            proc = bash.spawn_shell('echo out; echo err >&2', out.fileno())
+            self.assertEqual(proc.wait(5), 0)
+            out.seek(0)
+            self.assertEqual(sorted(out.read().splitlines()), [b'err', b'out'])
+
+    def test_exit_code_and_signal(self):
+        self.assertEqual(spawn_quiet('exit 3').wait(5), 3)
+        proc = spawn_quiet('sleep 5')
+        proc.kill()
+        self.assertEqual(proc.wait(5), -signal.SIGKILL)
+
+    def test_gate_holds_command_until_closed(self):
+        with tempfile.TemporaryFile() as out:
+            gate_read, gate_write = os.pipe()
+            try:
+                proc = bash.spawn_shell('echo "$0 $#"', out.fileno(), gate_read)
+            finally:
+                os.close(gate_read)
+            # Nothing runs while the gate is open
+            self.assertFalse(proc._exited_within(0.2))
+            os.write(out.fileno(), f"PID: {proc.pid}\n".encode())
+            os.close(gate_write)
+            self.assertEqual(proc.wait(5), 0)
+            out.seek(0)
+            self.assertEqual(out.read(), f"PID: {proc.pid}\n/bin/sh 0\n".encode())
+            self.assertEqual(proc.args, ['/bin/sh', '-c', 'echo "$0 $#"'])
+
+
+class SpawnedProcessTest(unittest.TestCase):
+    def test_exited_within_times_out(self):
+        proc = spawn_quiet('sleep 5')
+        try:
+            start = time.monotonic()
+            self.assertFalse(proc._exited_within(0.1))
+            self.assertGreaterEqual(time.monotonic() - start, 0.1)
+            # Waiting must not have reaped the child
+            self.assertIsNone(proc.returncode)
+        finally:
+            proc.kill()
+            proc.wait(5)
+
+    def test_exited_within_sees_exit(self):
+        proc = spawn_quiet('exit 0')
+        self.assertTrue(proc._exited_within(5))
+        self.assertEqual(proc.wait(), 0)
+
+    def test_exited_within_without_pidfd(self):
+        with mock.patch.object(bash.os, 'pidfd_open', side_effect=OSError):
+            proc = spawn_quiet('sleep 5')
+            try:
+                self.assertFalse(proc._exited_within(0.1))
+            finally:
+                proc.kill()
+            self.assertTrue(proc._exited_within(5))
+        self.assertEqual(proc.returncode, -signal.SIGKILL)
+
+    def test_wait_timeout(self):
+        proc = spawn_quiet('sleep 5')
+        try:
+            with self.assertRaises(subprocess.TimeoutExpired):
+                proc.wait(0.1)
+            self.assertIsNone(proc.poll())
+        finally:
+            proc.kill()
+            proc.wait(5)
+
+    def test_poll(self):
+        proc = spawn_quiet('exit 4')
+        self.assertTrue(proc._exited_within(5))
+        self.assertEqual(proc.poll(), 4)
+        # The recorded status is kept once reaped
+        self.assertEqual(proc.poll(), 4)
+        self.assertEqual(proc.wait(), 4)
+
+    def test_reaped_elsewhere_is_unknown(self):
+        proc = spawn_quiet('exit 0')
+        os.waitpid(proc.pid, 0)
+        self.assertEqual(proc.poll(), bash.UNKNOWN_RETURNCODE)
+        self.assertEqual(proc.wait(), bash.UNKNOWN_RETURNCODE)
+
+    def test_no_signal_after_reaping(self):
+        proc = spawn_quiet('exit 0')
+        proc.wait(5)
+        with mock.patch.object(bash.os, 'kill') as kill:
+            proc.terminate()
+        kill.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the per-file result cache in commands/_json_cache.py
+
+Run from the repository root with: python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commands import _json_cache
+
+
+class CachedForFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'todos.json')
+        _json_cache._cache.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data, mtime_ns=None):
+        # Replace the file the way save_todos does
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        if mtime_ns is not None:
+            os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp_path, self.path)
+
+    def test_reuses_unchanged_file(self):
+        self.write('[1]')
+        first = _json_cache.load_json_cached(self.path)
+        self.assertEqual(first, [1])
+        self.assertIs(_json_cache.load_json_cached(self.path), first)
+
+    def test_replaced_file_with_same_size_and_mtime(self):
+        self.write('[1]', mtime_ns=10**18)
+        # Keep the first file's inode in use, so the replacement gets another
+        held = os.open(self.path, os.O_RDONLY)
+        try:
+            self.assertEqual(_json_cache.load_json_cached(self.path), [1])
+            self.write('[2]', mtime_ns=10**18)
+            self.assertEqual(_json_cache.load_json_cached(self.path), [2])
+        finally:
+            os.close(held)
+
+    def test_concurrent_eviction(self):
+        paths = []
+        for i in range(_json_cache.MAX_ENTRIES * 2):
+            path = os.path.join(self.tmp.name, f'{i}.json')
+            with open(path, 'w') as f:
+                f.write(str(i))
+            paths.append(path)
+
+        errors = []
+
+        def load_all():
+            try:
+                for _ in range(20):
+                    for path in paths:
+                        _json_cache.load_json_cached(path)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=load_all) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(_json_cache._cache), _json_cache.MAX_ENTRIES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+"""
+Unit tests for the stream parsing, log writing and line splitting helpers in
+commands/runner.py
+
+Run from the repository root with: python -m unittest discover tests
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import json
+import unittest
+from collections import deque
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commands import runner
+
+
+class ShortWriter:
+    """os.writev() stand-in that accepts at most limit bytes per call"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.data = b''
+        self.calls = []
+
+    def __call__(self, fd, pieces):
+        self.calls.append(len(pieces))
+        written = b''.join(pieces)[:self.limit]
+        self.data += written
+        return len(written)
+
+
+def stream_line(**data):
+    return json.dumps(data).encode()
+
+
+def assistant_line(tool, input_tokens, output_tokens, **usage):
+    usage.update(input_tokens=input_tokens, output_tokens=output_tokens)
+    return stream_line(type='assistant', session_id='s-1', message={
+        'model': 'claude-x',
+        'content': [{'type': 'text', 'text': 'hi'},
+                    {'type': 'tool_use', 'id': tool, 'name': tool, 'input': {}}],
+        'usage': usage,
+    })
+
+
+class FakeManager:
+    def __init__(self, process_name):
+        self.process_info = {process_name: {'type': 'claude'}}
+
+
+class FakeLog:
+    def write(self, data):
+        pass
+
+
+class StreamParserTest(unittest.TestCase):
+    def test_progress_and_final_totals(self):
+        now = [100.0]
+        manager = FakeManager('run')
+        info = manager.process_info['run']
+        snapshots = []
+
+        def fake_stream(proc, stream_log, stderr_lines):
+            yield stream_line(type='system', subtype='init', session_id='s-1', tools=['Bash'])
+            yield assistant_line('Bash', 3, 5)
+            # Before PROGRESS_INTERVAL has passed nothing is pushed
+            snapshots.append(dict(info))
+            now[0] += runner.PROGRESS_INTERVAL
+            yield assistant_line('Read', 1, 1, cache_read_input_tokens=2)
+            snapshots.append(dict(info))
+            yield assistant_line('Bash', 10, 10, cache_creation_input_tokens=4)
+            snapshots.append(dict(info))
+            stderr_lines.append('warn')
+            yield stream_line(type='result', subtype='success', result='done', cost_usd=0.5,
+                              num_turns=3, session_id='s-1')
+
+        report_data = {}
+        with mock.patch.object(runner, 'iter_stream_lines', fake_stream), \
+                mock.patch.object(runner.time, 'monotonic', lambda: now[0]):
+            runner.stream_parser(None, FakeLog(), report_data, 'run', manager)
+
+        self.assertNotIn('total_tokens', snapshots[0])
+        self.assertEqual(snapshots[1]['tool_counts'], {'Bash': 1, 'Read': 1})
+        self.assertEqual(snapshots[1]['total_input_tokens'], 6)
+        self.assertEqual(snapshots[1]['total_output_tokens'], 6)
+        self.assertEqual(snapshots[1]['total_tokens'], 12)
+        self.assertEqual(snapshots[1]['model'], 'claude-x')
+        # The next push waits for another interval
+        self.assertEqual(snapshots[2], snapshots[1])
+
+        self.assertEqual(info['tool_counts'], {'Bash': 2, 'Read': 1})
+        self.assertEqual(info['total_input_tokens'], 20)
+        self.assertEqual(info['total_output_tokens'], 16)
+        self.assertEqual(info['total_tokens'], 36)
+        self.assertEqual(info['status'], 'success')
+        self.assertEqual(info['cost_usd'], 0.5)
+        self.assertFalse(info['is_error'])
+
+        self.assertEqual(report_data['session_id'], 's-1')
+        self.assertEqual(report_data['tools_available'], ['Bash'])
+        self.assertEqual(report_data['tool_counts'], {'Bash': 2, 'Read': 1})
+        self.assertEqual(report_data['total_tokens'], 36)
+        self.assertEqual(report_data['num_turns'], 3)
+        self.assertEqual(report_data['stderr'], 'warn')
+
+    def test_error_still_pushes_totals(self):
+        manager = FakeManager('run')
+
+        def failing_stream(proc, stream_log, stderr_lines):
+            yield assistant_line('Bash', 2, 3)
+            raise OSError('pipe went away')
+
+        report_data = {}
+        with mock.patch.object(runner, 'iter_stream_lines', failing_stream):
+            runner.stream_parser(None, FakeLog(), report_data, 'run', manager)
+
+        info = manager.process_info['run']
+        self.assertEqual(info['status'], 'error')
+        self.assertTrue(info['is_error'])
+        self.assertEqual(info['tool_counts'], {'Bash': 1})
+        self.assertEqual(info['total_tokens'], 5)
+        self.assertEqual(report_data['error'], 'pipe went away')
+
+
+class WritevAllTest(unittest.TestCase):
+    def test_short_writes(self):
+        pieces = [b'abc', b'', b'defgh', b'i', b'jklmnop']
+        for limit in range(1, 18):
+            with self.subTest(limit=limit):
+                writer = ShortWriter(limit)
+                with mock.patch.object(runner.os, 'writev', writer):
+                    runner.writev_all(3, list(pieces))
+                self.assertEqual(writer.data, b'abcdefghijklmnop')
+
+    def test_iov_max(self):
+        pieces = [bytes([i]) for i in range(10)]
+        writer = ShortWriter(1000)
+        with mock.patch.object(runner.os, 'writev', writer), \
+                mock.patch.object(runner, 'IOV_MAX', 3):
+            runner.writev_all(3, list(pieces))
+        self.assertEqual(writer.data, b''.join(pieces))
+        self.assertEqual(writer.calls, [3, 3, 3, 1])
+
+    def test_empties_pieces(self):
+        pieces = [b'ab', b'cd']
+        writer = ShortWriter(3)
+        with mock.patch.object(runner.os, 'writev', writer):
+            runner.writev_all(3, pieces)
+        self.assertEqual(pieces, [])
+
+    def test_real_fd(self):
+        with tempfile.TemporaryFile() as f:
+            runner.writev_all(f.fileno(), [b'one\n', bytearray(b'two\n'), memoryview(b'three\n')])
+            f.seek(0)
+            self.assertEqual(f.read(), b'one\ntwo\nthree\n')
+
+
+class BufferedLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def test_batches_until_max_bytes(self):
+        log = runner.BufferedLog(self.path, max_bytes=10, max_delay=60)
+        log.write(b'abcd')
+        log.write(b'efgh')
+        self.assertEqual(self.read(), b'')
+        self.assertIsNotNone(log.time_left())
+        log.write(b'ij')
+        self.assertEqual(self.read(), b'abcdefghij')
+        self.assertIsNone(log.time_left())
+        log.close()
+
+    def test_writes_after_max_delay(self):
+        log = runner.BufferedLog(self.path, max_bytes=1000, max_delay=0)
+        log.write(b'abc')
+        self.assertEqual(self.read(), b'abc')
+        log.close()
+
+    def test_flush_and_close(self):
+        log = runner.BufferedLog(self.path, max_bytes=1000, max_delay=60)
+        log.write(b'abc')
+        log.flush()
+        self.assertEqual(self.read(), b'abc')
+        log.write(b'def')
+        log.close()
+        self.assertEqual(self.read(), b'abcdef')
+        # Closing twice is harmless
+        log.close()
+
+
+class SplitLinesTest(unittest.TestCase):
+    def split_all(self, data, size):
+        """Feed data through split_lines in size-byte chunks"""
+        partial = []
+        completes = []
+        lines = []
+        for i in range(0, len(data), size):
+            complete, chunk_lines = runner.split_lines(data[i:i + size], partial)
+            completes.append(complete)
+            lines.extend(chunk_lines)
+        return b''.join(completes), lines, b''.join(partial)
+
+    def test_chunk_boundaries(self):
+        data = b'first\n\nsecond line\nthird\nunfinished'
+        for size in range(1, len(data) + 1):
+            with self.subTest(size=size):
+                complete, lines, rest = self.split_all(data, size)
+                self.assertEqual(complete, b'first\n\nsecond line\nthird\n')
+                self.assertEqual(lines, [b'first', b'', b'second line', b'third'])
+                self.assertEqual(rest, b'unfinished')
+
+    def test_no_newline(self):
+        partial = []
+        self.assertEqual(runner.split_lines(b'abc', partial), (b'', []))
+        self.assertEqual(runner.split_lines(b'def', partial), (b'', []))
+        self.assertEqual(runner.split_lines(b'\n', partial), (b'abcdef\n', [b'abcdef']))
+        self.assertEqual(partial, [])
+
+
+class IterStreamLinesTest(unittest.TestCase):
+    def test_lines_and_log(self):
+        script = (
+            "import sys\n"
+            "sys.stdout.write('one\\ntwo\\n'); sys.stdout.flush()\n"
+            "sys.stderr.write('warn\\n'); sys.stderr.flush()\n"
+            "sys.stdout.write('three')\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stream.log')
+            log = runner.BufferedLog(path)
+            stderr_lines = deque()
+            proc = subprocess.Popen([sys.executable, '-c', script],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                # Small reads so lines straddle chunks
+                with mock.patch.object(runner, 'STREAM_CHUNK_SIZE', 2):
+                    lines = list(runner.iter_stream_lines(proc, log, stderr_lines))
+            finally:
+                proc.stdout.close()
+                proc.stderr.close()
+                proc.wait()
+            log.close()
+
+            self.assertEqual(lines, [b'one', b'two', b'three'])
+            self.assertEqual(list(stderr_lines), ['warn'])
+            # The pipes are read as data arrives, so only each one's own
+            # order is fixed; lines are never split between them
+            with open(path, 'rb') as f:
+                logged = f.read().split(b'\n')
+            self.assertEqual([line for line in logged if not line.startswith(b'[STDERR] ')],
+                             [b'one', b'two', b'three'])
+            self.assertIn(b'[STDERR] warn', logged)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Unit tests for the helpers that read log and stream files from the end
+
+Covers tail_log (commands/bash_watch.py), read_last_line
+(commands/runner_status.py) and iter_lines_reversed (commands/tokens.py).
+
+Run from the repository root with: python -m unittest discover tests
+"""
+import mmap
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commands import bash_watch, runner_status, tokens
+
+SAMPLES = [
+    b'',
+    b'\n',
+    b'\n\n',
+    b'a',
+    b'a\n',
+    b'a\nb',
+    b'a\nb\n',
+    b'a\n\n',
+    b'one\ntwo\nthree\n',
+    b'one\ntwo\nthree',
+    b'longer than a block\nx\n',
+    b'x\nlonger than a block',
+    b'abc\ndefg\nhij\n\nklmnopq\n',
+]
+
+# Small enough that most samples span several blocks, with lines that end on,
+# straddle and fill whole block boundaries
+BLOCK_SIZES = range(1, 9)
+
+
+class FileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+
+class TailLogTest(FileTestCase):
+    def test_matches_splitlines(self):
+        for data in SAMPLES:
+            self.write(data)
+            expected = [line.decode().rstrip() for line in data.splitlines()]
+            for block_size in BLOCK_SIZES:
+                with mock.patch.object(bash_watch, 'TAIL_BLOCK_SIZE', block_size):
+                    for num_lines in range(1, 5):
+                        with self.subTest(data=data, block_size=block_size, num_lines=num_lines):
+                            self.assertEqual(bash_watch.tail_log(self.path, num_lines),
+                                             expected[-num_lines:])
+                    with self.subTest(data=data, block_size=block_size, num_lines=0):
+                        self.assertEqual(bash_watch.tail_log(self.path, 0), expected)
+
+    def test_decodes_split_characters(self):
+        # A multi-byte character split across blocks is decoded whole
+        self.write('first\nnaïve ☃\n'.encode())
+        with mock.patch.object(bash_watch, 'TAIL_BLOCK_SIZE', 3):
+            self.assertEqual(bash_watch.tail_log(self.path, 1), ['naïve ☃'])
+
+
+class ReadLastLineTest(FileTestCase):
+    def read_last_line(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            return runner_status.read_last_line(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+
+    def test_matches_tail(self):
+        for data in SAMPLES:
+            self.write(data)
+            # Like tail -n 1: the last line, with its newline if it has one
+            expected = data[data.rfind(b'\n', 0, len(data) - 1) + 1:]
+            for block_size in BLOCK_SIZES:
+                with self.subTest(data=data, block_size=block_size):
+                    with mock.patch.object(runner_status, 'TAIL_BLOCK_SIZE', block_size):
+                        self.assertEqual(self.read_last_line(), expected)
+
+    def test_reads_only_the_last_line(self):
+        self.write(b'x' * 1000 + b'\nlast\n')
+        with mock.patch.object(runner_status, 'TAIL_BLOCK_SIZE', 4), \
+                mock.patch.object(runner_status.os, 'pread', wraps=os.pread) as pread:
+            self.assertEqual(self.read_last_line(), b'last\n')
+        self.assertLessEqual(pread.call_count, 2)
+
+
+class IterLinesReversedTest(FileTestCase):
+    def test_matches_split(self):
+        for data in SAMPLES:
+            with self.subTest(data=data):
+                self.write(data)
+                expected = data.split(b'\n')[::-1] if data else []
+                self.assertEqual(list(tokens.iter_lines_reversed(self.path)), expected)
+
+    def test_page_boundaries(self):
+        # Lines ending just before, on and just after a page boundary
+        page = mmap.PAGESIZE
+        for offset in (-1, 0, 1):
+            with self.subTest(offset=offset):
+                data = b'a' * (page + offset - 1) + b'\n' + b'b' * page + b'\nc'
+                self.write(data)
+                self.assertEqual(list(tokens.iter_lines_reversed(self.path)),
+                                 data.split(b'\n')[::-1])
+
+    def test_stops_early(self):
+        self.write(b'first\nsecond\nthird\n')
+        lines = tokens.iter_lines_reversed(self.path)
+        self.assertEqual(next(lines), b'')
+        self.assertEqual(next(lines), b'third')
+        lines.close()
+
+
+if __name__ == '__main__':
+    unittest.main()